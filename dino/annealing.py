@@ -5,10 +5,48 @@ import random
 from math import inf as Infinity
 from copy import deepcopy
 from math import ceil, floor
+from hashlib import blake2b
+from .seenset import ExactSeenSet
+from .importance import GeneImportance
+from .initialization import createDesign, INITIALIZATION_METHODS
+from .rng import createRootSeed, createRng
 
 
 class Optimizer:
-    def __init__(self, minimumIterationsToRun: int = 100, earlyStoppingIters: int = 20):
+    def __init__(self, minimumIterationsToRun: int = 100, earlyStoppingIters: int = 20, seenSet: object = None,
+                 maxSeenNeighbourSkips: int = 100, freezeAfterTrials: int = None, freezeImportanceThreshold: float = 0.05,
+                 initialization: str = "random", numInitialProbes: int = 1, seed: int = None,
+                 maxRejectedProposals: int = 1000):
+        """
+        :param minimumIterationsToRun: The number of iterations it takes the temperature to reach 0
+        :param earlyStoppingIters: The number of unimproved iterations, after the temperature reaches 0, before stopping
+        :param seenSet: Where previously tried solutions and their scores are recorded, so they are never trained twice.
+        Defaults to an ExactSeenSet.  Pass a BloomSeenSet to bound its memory on very long runs.
+        A BloomSeenSet cannot recall scores, so seen neighbours are skipped instead of resolved.
+        Solutions that fail the constraints are recorded in a second, empty seen-set of the same kind and settings.
+        :param maxSeenNeighbourSkips: Only matters when seenSet cannot recall scores, as with a BloomSeenSet.  How many already
+        tried neighbours to skip in a row before looking for an untried solution anywhere in the search space.
+        If there is none, an already tried neighbour is handed back and trained again.  That costs a run, but lets the
+        optimizer carry on once a small search space is used up.  A higher value searches the neighbourhood harder first.
+        :param freezeAfterTrials: If set, once this many solutions have been scored, genes that barely affect the score
+        are frozen at their best values for the rest of the run, so mutation focuses on the genes that matter.
+        :param freezeImportanceThreshold: Genes with an importance below this, between 0 and 1, are frozen.  See getGeneImportance.
+        :param initialization: How starting points are drawn.  "random", "latinHypercube" or "halton".
+        See dino.initialization.createDesign.
+        :param numInitialProbes: How many unique starting points to try before annealing begins.  Annealing starts from the best.
+        Probes count as completed iterations, but do not lower the temperature.
+        :param seed: The root seed of all of this Optimizer's randomness.  The same seed, genes and scores replay the same run.
+        If None, a seed is drawn at random.  Either way it is kept in the seed attribute, so any run can be replayed.
+        :param maxRejectedProposals: How many neighbours in a row may fail the constraints, or match the current solution,
+        before the search widens to the whole search space.  If that finds nothing either, the run stops.
+        """
+        if initialization not in INITIALIZATION_METHODS:
+            raise Exception("Unknown initialization " + str(initialization) + ".  Choose one of " + str(INITIALIZATION_METHODS) + ".")
+        if numInitialProbes < 1:
+            raise Exception("numInitialProbes must be at least 1")
+        self.seed: int = seed if seed is not None else createRootSeed()
+        # Every random draw the Optimizer makes comes from its own stream, so Optimizers never disturb each other.
+        self.rng: random.Random = createRng(self.seed, "optimizer")
         self.numIterationsCompleted: int = 0
         self.bestScore: float = Infinity
         self.bestArtifact = None
@@ -23,6 +61,25 @@ class Optimizer:
         self.earlyStoppingIters: int = earlyStoppingIters
         self.earlyStoppingUnimprovedIterCount: int = 0
         self.earlyStoppingNeedToStop: bool = False
+        self.seenSet = seenSet if seenSet is not None else ExactSeenSet()
+        self.maxSeenNeighbourSkips: int = maxSeenNeighbourSkips
+        self.numIterationsResolvedFromHistory: int = 0
+        self.constraints: list = []
+        self.numConstraintChecks: int = 0
+        self.numConstraintRejections: int = 0
+        # Kept in a seen-set of the same kind, so a BloomSeenSet's memory budget also covers rejected solutions.
+        self.infeasibleSet = self.seenSet.createEmptyCopy()
+        self.maxRejectedProposals: int = maxRejectedProposals
+        self.geneImportance: GeneImportance = GeneImportance()
+        self.freezeAfterTrials: int = freezeAfterTrials
+        self.freezeImportanceThreshold: float = freezeImportanceThreshold
+        self.freezeCheckDone: bool = freezeAfterTrials is None
+        self.frozenGenes: dict = {}
+        self.importanceWhenFrozen: dict = {}
+        self.initialization: str = initialization
+        self.numInitialProbes: int = numInitialProbes
+        self.pendingProbes: list = []
+        self.numProbesRemaining: int = 0
 
     def addGene(self, label: str, gene: object):
         """
@@ -42,6 +99,29 @@ class Optimizer:
             raise Exception("No gene passed to addGene")
         self.requestedGenes[label] = gene
 
+    def addConstraint(self, constraint):
+        """
+        Adds a feasibility check that every solution must pass before it is handed to you.
+
+        The constraint is called with a dictionary of the solution's parameters, keyed by the gene labels,
+        and must return True if the solution is feasible.  Infeasible solutions are never tried and do not
+        use up an iteration.  Keep constraints cheap, as they may be called many times.
+
+        Example:
+        myOptimizer = Optimizer(100, 20)
+        myOptimizer.addGene("batch_size", GeneInt(1, 1000))
+        myOptimizer.addConstraint(lambda params: 60000 % params["batch_size"] == 0)
+
+        If you pickle the Optimizer to resume it later, its constraints are pickled with it.  A lambda or nested function
+        can't be, so use functions defined at the top level of a module for those runs.
+
+        :param constraint: A function that takes a dictionary of parameters and returns a bool
+        :return: Nothing
+        """
+        if constraint is None:
+            raise Exception("No constraint passed to addConstraint")
+        self.constraints.append(constraint)
+
     def getGeneValue(self, label: str):
         """
         Retrieves the value of the Gene stored by the key "label".
@@ -68,36 +148,97 @@ class Optimizer:
 
         print("Number of Possible Solutions: " + str(self.numPossibleSolutions))
 
-        newIndividual = Individual()
-        for key in self.requestedGenes:
-            origGene = self.requestedGenes[key]
-            newGene = deepcopy(origGene)
-            newGene.mutate(self)
-            newIndividual.genes[key] = newGene
-        self.curIndividual = newIndividual
+        self.pendingProbes = []
+        if self.initialization != "random" or self.numInitialProbes > 1:
+            numProbes = min(self.numInitialProbes, self.numPossibleSolutions)
+            for newIndividual in self.createDesignIndividuals(numProbes):
+                if self.isFeasible(newIndividual):
+                    self.pendingProbes.append(newIndividual)
+
+        # Fall back to a random starting point if there is no design, or none of it passed the constraints.
+        numRejectedProposals = 0
+        while len(self.pendingProbes) == 0:
+            newIndividual = self.createRandomIndividual()
+            if self.isFeasible(newIndividual):
+                self.pendingProbes.append(newIndividual)
+                break
+            numRejectedProposals += 1
+            if numRejectedProposals >= self.maxRejectedProposals:
+                raise Exception("FATAL: Too many solutions fail your constraints.  No feasible starting point was found in " + str(
+                    numRejectedProposals) + " attempts.  Either loosen your constraints or raise maxRejectedProposals.")
+        # A single starting point needs no probing phase.  It is simply the first iteration.
+        self.numProbesRemaining = len(self.pendingProbes) if len(self.pendingProbes) > 1 else 0
+        self.curIndividual = self.pendingProbes.pop(0)
 
     def next(self, inputScore: float = Infinity, userArtifact: object = None):
         # Early stopping
         if self.earlyStoppingNeedToStop:
             return self.earlyStoppingNeedToStop, self.numIterationsCompleted, self.bestScore, self.bestArtifact
 
-        self.numIterationsCompleted += 1
+        self.geneImportance.record(self.curIndividual.genes, inputScore)
 
-        # Set temperature. Linear.
-        self.curTemperature -= self.temperatureStepSize
-        if self.curTemperature < 0:
-            self.curTemperature = 0
+        if self.numProbesRemaining > 0:
+            self.completeProbe(inputScore, userArtifact)
+        else:
+            self.completeIteration(inputScore, userArtifact)
 
+        # Proposals that were already scored are resolved from the seen-set rather than handed back to be trained again.
+        # They still count as iterations, so the temperature keeps falling and early stopping still triggers.
+        while not self.earlyStoppingNeedToStop:
+            knownScore = self.seenSet.getScore(self.curIndividual.getHash())
+            if knownScore is None:
+                break
+            self.numIterationsResolvedFromHistory += 1
+            self.completeIteration(knownScore)
+        return self.earlyStoppingNeedToStop, self.numIterationsCompleted, self.bestScore, self.bestArtifact
 
-        # Scoring and saving of scores, artifacts, etc.
+    def completeProbe(self, inputScore: float, userArtifact: object = None):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        self.numIterationsCompleted += 1
+        self.numProbesRemaining -= 1
+        self.recordScore(inputScore, userArtifact)
+        if self.origIndividual is None or self.curIndividual.score < self.origIndividual.score:
+            self.origIndividual = deepcopy(self.curIndividual)
+        if self.numProbesRemaining > 0:
+            self.curIndividual = self.pendingProbes.pop(0)
+            return
+        # Every probe has been scored.  Start annealing from the best one.
+        self.curIndividual = self.proposeIndividual(self.origIndividual)
+
+    def recordScore(self, inputScore: float, userArtifact: object = None):
+        """
+        NOT FOR EXTERNAL USE.
+        """
         scoreImproved = False
         self.curIndividual.score = inputScore
+        self.seenSet.add(self.curIndividual.getHash(), inputScore)
         if inputScore < self.bestScore:
             scoreImproved = True
             self.bestScore = inputScore
             self.bestGenes = self.curIndividual.genes
             if userArtifact is not None:
                 self.bestArtifact = userArtifact
+        # Only freeze once this score is recorded, so the trial that triggered the freeze can supply the best values.
+        if not self.freezeCheckDone and self.geneImportance.numTrials >= self.freezeAfterTrials:
+            self.freezeUnimportantGenes()
+        return scoreImproved
+
+    def completeIteration(self, inputScore: float, userArtifact: object = None):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        self.numIterationsCompleted += 1
+
+        # Set temperature. Linear.
+        self.curTemperature -= self.temperatureStepSize
+        if self.curTemperature < 0:
+            self.curTemperature = 0
+
+
+        # Scoring and saving of scores, artifacts, etc.
+        scoreImproved = self.recordScore(inputScore, userArtifact)
 
         #Early stopping
         if self.earlyStoppingEnabled:
@@ -107,24 +248,16 @@ class Optimizer:
                 self.earlyStoppingUnimprovedIterCount += 1
                 if self.earlyStoppingUnimprovedIterCount >= self.earlyStoppingIters:
                     self.earlyStoppingNeedToStop = True
-                    return self.earlyStoppingNeedToStop, self.numIterationsCompleted, self.bestScore, self.bestArtifact
+                    return
         #Enable early stopping
         if self.curTemperature <= 0 and self.earlyStoppingEnabled is False:
             self.earlyStoppingEnabled = True
 
         # The first iteration is a special case.  We have no loss to compare to, so just mutate the individual.
-        if self.numIterationsCompleted == 1:
+        if self.origIndividual is None:
             self.origIndividual = deepcopy(self.curIndividual)
-            # Ensure the new Individual is different than the last.
-            startingHash = self.curIndividual.getHash()
-            while True:
-                individualCopy = deepcopy(self.curIndividual)
-                self.mutateIndividual(individualCopy)
-                newHash = individualCopy.getHash()
-                if newHash != startingHash:
-                    self.curIndividual = individualCopy
-                    break
-            return self.earlyStoppingNeedToStop, self.numIterationsCompleted, self.bestScore, self.bestArtifact
+            self.curIndividual = self.proposeIndividual(self.curIndividual)
+            return
 
         # Determine which solution to use
         curScore = self.curIndividual.score
@@ -135,7 +268,7 @@ class Optimizer:
             normalizedOrigScore = (origScore / curScore) * 100
             normalizedDifference = normalizedCurScore - normalizedOrigScore
             chanceOfBeingKept = self.curTemperature - normalizedDifference
-            randomNum = random.uniform(0, 100)
+            randomNum = self.rng.uniform(0, 100)
             if randomNum < chanceOfBeingKept:
                 self.origIndividual = deepcopy(self.curIndividual)
             else:
@@ -144,30 +277,194 @@ class Optimizer:
             self.origIndividual = deepcopy(self.curIndividual)
 
         # All of the below is ran regardless of which solution was chosen.
-        #Ensure the new Individual is different than the last.
-        startingHash = self.curIndividual.getHash()
-        while True:
-            individualCopy = deepcopy(self.curIndividual)
+        self.curIndividual = self.proposeIndividual(self.curIndividual)
+
+    def proposeIndividual(self, individual):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        # Ensure the new Individual is different than the last.  If a seen neighbour's score is known, next() resolves it
+        # without training.  If not, as with a BloomSeenSet, prefer a solution that has not been tried yet.
+        # Anything handed back to the user must pass the constraints.
+        startingHash = individual.getHash()
+        seenNeighbour = None
+        numSeenNeighbourSkips = 0
+        numRejectedProposals = 0
+        while numRejectedProposals < self.maxRejectedProposals:
+            individualCopy = deepcopy(individual)
             self.mutateIndividual(individualCopy)
+            for key in self.frozenGenes:
+                individualCopy.genes[key] = deepcopy(self.frozenGenes[key])
             newHash = individualCopy.getHash()
             if newHash != startingHash:
-                self.curIndividual = individualCopy
-                break
-        return self.earlyStoppingNeedToStop, self.numIterationsCompleted, self.bestScore, self.bestArtifact
+                if newHash in self.seenSet:
+                    if self.seenSet.getScore(newHash) is not None:
+                        return individualCopy
+                    numSeenNeighbourSkips += 1
+                    if numSeenNeighbourSkips < self.maxSeenNeighbourSkips:
+                        continue
+                    # The neighbourhood looks used up.  Keep this one to train again, only if nothing untried turns up below.
+                    if self.isFeasible(individualCopy):
+                        seenNeighbour = individualCopy
+                        break
+                elif self.isFeasible(individualCopy):
+                    return individualCopy
+            numRejectedProposals += 1
+
+        # At low temperatures every neighbour within reach may be infeasible, IE only odd batch sizes, or already tried.
+        # Widen the search to the whole search space before giving up.
+        for _ in range(self.maxRejectedProposals):
+            individualCopy = self.createRandomIndividual()
+            newHash = individualCopy.getHash()
+            if newHash == startingHash:
+                continue
+            if newHash in self.seenSet and self.seenSet.getScore(newHash) is None:
+                continue
+            if self.isFeasible(individualCopy):
+                return individualCopy
+        if seenNeighbour is not None:
+            return seenNeighbour
+        print("No feasible, untried solution could be found.  Stopping optimization.")
+        self.earlyStoppingNeedToStop = True
+        return individual
+
+    def createRandomIndividual(self):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        newIndividual = Individual()
+        for key in self.requestedGenes:
+            if key in self.frozenGenes:
+                newIndividual.genes[key] = deepcopy(self.frozenGenes[key])
+                continue
+            newGene = deepcopy(self.requestedGenes[key])
+            # Drawn afresh from the Optimizer's stream, as the value the Gene was constructed with was not.
+            newGene.setValueByIndex(self.rng.randrange(newGene.getNumParameters()))
+            newIndividual.genes[key] = newGene
+        return newIndividual
+
+    def createDesignIndividuals(self, numIndividuals: int):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        labels = list(self.requestedGenes)
+        numParamsPerGene = [self.requestedGenes[label].getNumParameters() for label in labels]
+        individuals = []
+        for indexes in createDesign(numParamsPerGene, numIndividuals, self.initialization, self.rng):
+            newIndividual = Individual()
+            for label, index in zip(labels, indexes):
+                newGene = deepcopy(self.requestedGenes[label])
+                newGene.setValueByIndex(index)
+                newIndividual.genes[label] = newGene
+            individuals.append(newIndividual)
+        return individuals
+
+    def freezeUnimportantGenes(self):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        self.freezeCheckDone = True
+        if self.bestGenes is None:
+            return
+        importance = self.geneImportance.getImportance()
+        # A low estimate only means a gene doesn't matter if there is evidence behind it.  With too few or all equal scores
+        # every gene looks unimportant, and freezing on that would throw away most of the search space for nothing.
+        labelsWithEvidence = [label for label in self.requestedGenes if self.geneImportance.hasEvidence(label)]
+        if len(labelsWithEvidence) == 0:
+            print("Not freezing genes.  The scores so far don't show which genes matter.")
+            return
+        # Least important first.  The most important gene is never frozen, so there is always something left to optimize.
+        labelsByImportance = sorted(self.requestedGenes, key=lambda label: importance.get(label, 0.0))
+        labelsToFreeze = [label for label in labelsByImportance[:-1]
+                          if label in labelsWithEvidence and importance.get(label, 0.0) < self.freezeImportanceThreshold]
+        if len(labelsToFreeze) == 0:
+            return
+        self.numPossibleSolutions = 1
+        for label in self.requestedGenes:
+            if label in labelsToFreeze:
+                self.frozenGenes[label] = deepcopy(self.bestGenes[label])
+                self.importanceWhenFrozen[label] = importance.get(label, 0.0)
+            else:
+                self.numPossibleSolutions *= self.requestedGenes[label].getNumParameters()
+        print("Froze genes " + str(labelsToFreeze) + " at their best values.  Number of Possible Solutions: " + str(
+            self.numPossibleSolutions))
+
+        # Probes not yet handed out must use the frozen values too.  Drop any that then match an already
+        # tried solution or another probe, or that fail the constraints.
+        remainingProbes = []
+        probeHashes = set()
+        for probe in self.pendingProbes:
+            for label in labelsToFreeze:
+                probe.genes[label] = deepcopy(self.frozenGenes[label])
+            probeHash = probe.getHash()
+            if probeHash in probeHashes or probeHash in self.seenSet or not self.isFeasible(probe):
+                continue
+            probeHashes.add(probeHash)
+            remainingProbes.append(probe)
+        self.pendingProbes = remainingProbes
+        self.numProbesRemaining = len(self.pendingProbes)
+
+    def getGeneImportance(self):
+        """
+        Returns how much each gene has affected the score so far, and whether it has been frozen.
+        An importance is the fraction of the score's variance explained by the gene, between 0 and 1.  See GeneImportance.
+        A frozen gene reports the importance it was frozen on, as once frozen its single value says nothing more about the score.
+        :return: A dictionary keyed by gene label, holding dictionaries with "importance" and "frozen" keys
+        """
+        importance = self.geneImportance.getImportance()
+        report = {}
+        for label in self.requestedGenes:
+            if label in self.frozenGenes:
+                report[label] = {"importance": self.importanceWhenFrozen[label], "frozen": True}
+            else:
+                report[label] = {"importance": importance.get(label, 0.0), "frozen": False}
+        return report
+
+    def isFeasible(self, individual):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        if len(self.constraints) == 0:
+            return True
+        # Solutions already known to be infeasible are neither checked nor counted again.
+        # With a BloomSeenSet, a false positive occasionally passes over a feasible solution unchecked.
+        individualHash = individual.getHash()
+        if individualHash in self.infeasibleSet:
+            return False
+        self.numConstraintChecks += 1
+        dictOfValues = {}
+        for key in individual.genes:
+            dictOfValues[key] = individual.genes[key].value
+        for constraint in self.constraints:
+            if not constraint(dictOfValues):
+                self.numConstraintRejections += 1
+                self.infeasibleSet.add(individualHash)
+                return False
+        return True
+
+    def getConstraintRejectionRate(self):
+        """
+        Returns the fraction of distinct proposed solutions that failed the constraints added with addConstraint.
+        :return: A float between 0 and 1.  0 if no solutions have been checked yet.
+        """
+        if self.numConstraintChecks == 0:
+            return 0.0
+        return self.numConstraintRejections / self.numConstraintChecks
 
     def mutateIndividual(self, individual):
         """
         NOT FOR EXTERNAL USE.
         """
-        numGenesInIndividual = len(individual.genes)
+        mutableGenes = [individual.genes[k] for k in individual.genes if k not in self.frozenGenes]
+        numGenesInIndividual = len(mutableGenes)
         adjustedTemperature = self.curTemperature
         if adjustedTemperature <= 0:
             adjustedTemperature = self.temperatureStepSize
         adjustedNumGenesInIndividual = ceil(numGenesInIndividual * (adjustedTemperature / 100))
         if adjustedNumGenesInIndividual > numGenesInIndividual:
             adjustedNumGenesInIndividual = numGenesInIndividual
-        numGenesToMutate = random.randint(1, adjustedNumGenesInIndividual)
-        listOfGenesToMutate = random.sample(list(individual.genes.values()), numGenesToMutate)
+        numGenesToMutate = self.rng.randint(1, adjustedNumGenesInIndividual)
+        listOfGenesToMutate = self.rng.sample(mutableGenes, numGenesToMutate)
         for gene in listOfGenesToMutate:
             gene.mutate(self)
 
@@ -184,6 +481,29 @@ class Optimizer:
             dictOfValues[key] = value
         return dictOfValues
 
+    def spawnRng(self, *streamPath):
+        """
+        Creates a random stream of its own, derived from this Optimizer's seed, for work done on its behalf.
+        IE one per worker, thread or island generating candidates in parallel.  Streams with different paths are independent,
+        and the same path always gives the same stream, so parallel work replays exactly when the seed is reused.
+
+        Example:
+        workerRngs = [myOptimizer.spawnRng("worker", workerNum) for workerNum in range(4)]
+
+        :param streamPath: Any number of strings or integers naming the stream
+        :return: A random.Random instance
+        """
+        # Spawned streams get a namespace of their own, so no path can hand out a copy of the Optimizer's own stream.
+        return createRng(self.seed, "spawn", *streamPath)
+
+    def getSeenSetStats(self):
+        """
+        Returns a dictionary of statistics about the record of previously tried solutions.
+        See ExactSeenSet.getStats and BloomSeenSet.getStats.
+        :return: A dictionary of statistics, including occupancy and the estimated false positive rate
+        """
+        return self.seenSet.getStats()
+
 
 class Individual:
     """
@@ -199,8 +519,9 @@ class Individual:
         for key in self.genes:
             curGene = self.genes[key]
             hashableValue = curGene.getHashableValue()
-            stringToHash += hashableValue
-        hashOfValues = hash(stringToHash)
+            stringToHash += hashableValue + "|"
+        # Python's own hash() of a string changes from process to process, which would break resuming a pickled Optimizer.
+        hashOfValues = int.from_bytes(blake2b(stringToHash.encode(), digest_size=8).digest(), "little")
         return hashOfValues
 
 
@@ -216,9 +537,9 @@ class GeneBool:
         chanceOfMutation = optimizer.curTemperature
         if chanceOfMutation <= 0:
             chanceOfMutation = optimizer.temperatureStepSize
-        randomNumber = random.uniform(0, 100)
+        randomNumber = optimizer.rng.uniform(0, 100)
         if randomNumber < chanceOfMutation:
-            self.value = random.choice([True, False])
+            self.value = optimizer.rng.choice([True, False])
 
     def getHashableValue(self) -> str:
         return str(self.value)
@@ -226,6 +547,12 @@ class GeneBool:
     def getNumParameters(self):
         return 2
 
+    def getImportanceLevel(self, numBins: int):
+        return self.value
+
+    def setValueByIndex(self, index: int):
+        self.value = [False, True][index]
+
 
 class GeneInt:
     """
@@ -251,7 +578,7 @@ class GeneInt:
         upperValue = self.value + samplingSizeForOneSide
         possibleValue = 0
         while True:
-            possibleValue = random.randint(lowerValue, upperValue)
+            possibleValue = optimizer.rng.randint(lowerValue, upperValue)
             if possibleValue >= self.min and possibleValue <= self.max:
                 break
         self.value = possibleValue
@@ -262,6 +589,15 @@ class GeneInt:
     def getNumParameters(self):
         return (self.max - self.min) + 1
 
+    def getImportanceLevel(self, numBins: int):
+        numParams = self.getNumParameters()
+        if numParams <= numBins:
+            return self.value
+        return floor((self.value - self.min) * numBins / numParams)
+
+    def setValueByIndex(self, index: int):
+        self.value = self.min + index
+
 
 class GeneFloat:
     """
@@ -290,18 +626,29 @@ class GeneFloat:
         upperValue = (adjustedFloatToLargeValue + samplingSizeForOneSide) / (10 ** self.numDecimalPlaces)
         possibleValue = 0
         while True:
-            possibleValue = round(random.uniform(lowerValue, upperValue), self.numDecimalPlaces)
+            possibleValue = round(optimizer.rng.uniform(lowerValue, upperValue), self.numDecimalPlaces)
             if possibleValue >= self.min and possibleValue <= self.max:
                 break
         self.value = possibleValue
 
     def getHashableValue(self) -> str:
-        return str(self.value)
+        # The step number rather than the value, as str() tells apart values that are equal, IE -0.0 and 0.0.
+        return str(round((self.value - self.min) * (10 ** self.numDecimalPlaces)))
 
     def getNumParameters(self):
         numParams = ((self.max * (10 ** self.numDecimalPlaces)) - (self.min * (10 ** self.numDecimalPlaces))) + 1
         return numParams
 
+    def getImportanceLevel(self, numBins: int):
+        numParams = self.getNumParameters()
+        stepNum = round((self.value - self.min) * (10 ** self.numDecimalPlaces))
+        if numParams <= numBins:
+            return stepNum
+        return min(numBins - 1, floor(stepNum * numBins / numParams))
+
+    def setValueByIndex(self, index: int):
+        self.value = round(self.min + index / (10 ** self.numDecimalPlaces), self.numDecimalPlaces)
+
 
 class GeneChoice:
     """
@@ -322,9 +669,9 @@ class GeneChoice:
         chanceOfMutation = optimizer.curTemperature
         if chanceOfMutation <= 0:
             chanceOfMutation = optimizer.temperatureStepSize
-        randomNumber = random.uniform(0, 100)
+        randomNumber = optimizer.rng.uniform(0, 100)
         if randomNumber < chanceOfMutation:
-            self.value = random.choice(self.choices)
+            self.value = optimizer.rng.choice(self.choices)
 
     def getHashableValue(self) -> str:
         indexOfCurrentValue = self.choices.index(self.value)
@@ -333,6 +680,12 @@ class GeneChoice:
     def getNumParameters(self):
         return len(self.choices)
 
+    def getImportanceLevel(self, numBins: int):
+        return self.choices.index(self.value)
+
+    def setValueByIndex(self, index: int):
+        self.value = self.choices[index]
+
 # optim = Optimizer(minimumIterationsToRun=100, earlyStoppingIters=10)
 # optim.addGene("gene_1", GeneBool())
 # optim.addGene("gene_2", GeneInt(1, 100))
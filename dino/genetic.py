@@ -5,10 +5,17 @@ import random
 from math import inf as Infinity
 from copy import deepcopy
 from math import ceil, floor
+from hashlib import blake2b
+from .seenset import ExactSeenSet
+from .importance import GeneImportance
+from .initialization import createDesign, INITIALIZATION_METHODS
+from .rng import createRootSeed, createRng
 
 
 class Optimizer:
-    def __init__(self, populationSize: int = 10, chanceOfMutation: int = 5):
+    def __init__(self, populationSize: int = 10, chanceOfMutation: int = 5, seenSet: object = None,
+                 freezeAfterTrials: int = None, freezeImportanceThreshold: float = 0.05, initialization: str = "random",
+                 seed: int = None, maxSeenProposalsBeforeExhausted: int = 1000):
         """
         The main interface to Dino.
 
@@ -20,7 +27,26 @@ class Optimizer:
 
         :param populationSize: The number of solutions(Individuals) generated and tried per generation
         :param chanceOfMutation: A value between 1 and 100.  An integer value dictating a new Individual's chance of mutating
+        :param seenSet: Where previously generated solutions are recorded, for deduplication.  Defaults to an ExactSeenSet.
+        Pass a BloomSeenSet to bound its memory on very long runs.
+        :param freezeAfterTrials: If set, once this many solutions have been scored, genes that barely affect the score
+        are frozen at their best values for the rest of the run, so breeding and mutation focus on the genes that matter.
+        The check happens at the end of the generation in which the count is reached.
+        :param freezeImportanceThreshold: Genes with an importance below this, between 0 and 1, are frozen.  See getGeneImportance.
+        :param initialization: How the first generation is created.  "random" draws every solution independently.
+        "latinHypercube" and "halton" spread the first generation evenly over the search space, which matters most
+        for small populations.  See dino.initialization.createDesign.
+        :param seed: The root seed of all of this Optimizer's randomness.  The same seed, genes and scores replay the same run.
+        If None, a seed is drawn at random.  Either way it is kept in the seed attribute, so any run can be replayed.
+        :param maxSeenProposalsBeforeExhausted: Only used with an approximate seenSet, such as a BloomSeenSet.  Its false positives
+        hide some solutions for good, so after this many already seen solutions in a row the search space is treated as used up
+        and the run ends.  Unlike annealing, the genetic optimizer never hands a solution back to be trained again.
         """
+        if initialization not in INITIALIZATION_METHODS:
+            raise Exception("Unknown initialization " + str(initialization) + ".  Choose one of " + str(INITIALIZATION_METHODS) + ".")
+        self.seed: int = seed if seed is not None else createRootSeed()
+        # Every random draw the Optimizer makes comes from its own stream, so Optimizers never disturb each other.
+        self.rng: random.Random = createRng(self.seed, "optimizer")
         self.populationSize: int = populationSize
         self.numGenerationsCompleted: int = 0
         self.curGenerationIndividuals: list = []
@@ -31,11 +57,23 @@ class Optimizer:
         self.bestScore: float = Infinity
         self.bestArtifact = None
         self.bestGenes = None
-        self.listOfHashes: list = []
+        self.seenSet = seenSet if seenSet is not None else ExactSeenSet()
+        self.maxSeenProposalsBeforeExhausted: int = maxSeenProposalsBeforeExhausted
         self.numPossibleSolutions: int = 0
         # self.scoreImproved: bool = False
         self.baselineMutationChance: int = chanceOfMutation
         self.curMutationChance: int = self.baselineMutationChance
+        self.constraints: list = []
+        self.numConstraintChecks: int = 0
+        self.numConstraintRejections: int = 0
+        self.geneImportance: GeneImportance = GeneImportance()
+        self.freezeAfterTrials: int = freezeAfterTrials
+        self.freezeImportanceThreshold: float = freezeImportanceThreshold
+        self.frozenGenes: dict = {}
+        self.importanceWhenFrozen: dict = {}
+        # Every solution tried before freezing, so the remaining search space can be recounted.  Dropped once frozen.
+        self.solutionsTriedBeforeFreezing: list = [] if freezeAfterTrials is not None else None
+        self.initialization: str = initialization
 
     def addGene(self, label: str, gene: object):
         """
@@ -55,6 +93,29 @@ class Optimizer:
             raise Exception("No gene passed to addGene")
         self.requestedGenes[label] = gene
 
+    def addConstraint(self, constraint):
+        """
+        Adds a feasibility check that every solution must pass before it is handed to you.
+
+        The constraint is called with a dictionary of the solution's parameters, keyed by the gene labels,
+        and must return True if the solution is feasible.  Infeasible solutions are never tried, and
+        are removed from the number of possible solutions.  Keep constraints cheap, as they may be called many times.
+
+        Example:
+        myOptimizer = Optimizer(10, 100)
+        myOptimizer.addGene("batch_size", GeneInt(1, 1000))
+        myOptimizer.addConstraint(lambda params: 60000 % params["batch_size"] == 0)
+
+        If you pickle the Optimizer to resume it later, its constraints are pickled with it.  A lambda or nested function
+        can't be, so use functions defined at the top level of a module for those runs.
+
+        :param constraint: A function that takes a dictionary of parameters and returns a bool
+        :return: Nothing
+        """
+        if constraint is None:
+            raise Exception("No constraint passed to addConstraint")
+        self.constraints.append(constraint)
+
     def getGeneValue(self, label: str):
         """
         Retrieves the value of the Gene stored by the key "label".
@@ -99,19 +160,45 @@ class Optimizer:
 
         print("Number of Possible Solutions: " + str(self.numPossibleSolutions))
         print("Generating initial pool of possible solutions...")
-        for _ in range(self.populationSize):
+        if self.initialization != "random":
+            # Design solutions are unique by construction.  Any that fail the constraints are replaced at random below.
+            for newIndividual in self.createDesignIndividuals(self.populationSize):
+                self.seenSet.add(newIndividual.getHash())
+                if not self.isFeasible(newIndividual):
+                    self.recordTriedSolution(newIndividual)
+                    self.numPossibleSolutions -= 1
+                    continue
+                self.curGenerationIndividuals.append(newIndividual)
+            if self.numPossibleSolutions < self.populationSize:
+                raise Exception("FATAL: Too many solutions fail your constraints.  Only " + str(
+                    self.numPossibleSolutions) + " possible solutions remain, which is smaller than your population size of " + str(
+                    self.populationSize) + ".  Either loosen your constraints or decrease your population size.")
+        for _ in range(self.populationSize - len(self.curGenerationIndividuals)):
+            numSeenProposals = 0
             while True:
                 newIndividual = Individual()
                 for key in self.requestedGenes:
                     origGene = self.requestedGenes[key]
                     newGene = deepcopy(origGene)
-                    newGene.mutate()
+                    newGene.mutate(self.rng)
                     newIndividual.genes[key] = newGene
                 individualHash = newIndividual.getHash()
-                if individualHash not in self.listOfHashes:
-                    self.listOfHashes.append(individualHash)
+                if individualHash not in self.seenSet:
+                    self.seenSet.add(individualHash)
+                    if not self.isFeasible(newIndividual):
+                        self.recordTriedSolution(newIndividual)
+                        self.numPossibleSolutions -= 1
+                        if self.numPossibleSolutions < self.populationSize:
+                            raise Exception("FATAL: Too many solutions fail your constraints.  Only " + str(
+                                self.numPossibleSolutions) + " possible solutions remain, which is smaller than your population size of " + str(
+                                self.populationSize) + ".  Either loosen your constraints or decrease your population size.")
+                        continue
                     self.curGenerationIndividuals.append(newIndividual)
                     break
+                numSeenProposals += 1
+                if not self.seenSet.isExact and numSeenProposals >= self.maxSeenProposalsBeforeExhausted:
+                    raise Exception("FATAL: " + str(numSeenProposals) + " solutions in a row were reported as already seen while creating the first generation."
+                                    + "  Your seenSet is saturated.  Give it more memory or a higher falsePositiveRate.")
         self.curIndividual = self.curGenerationIndividuals[self.curIndividualNum]
 
     def next(self, inputScore: float = Infinity, userArtifact: object = None):
@@ -156,6 +243,8 @@ class Optimizer:
             if userArtifact is not None:
                 self.bestArtifact = userArtifact
         self.curIndividual.score = inputScore
+        self.geneImportance.record(self.curIndividual.genes, inputScore)
+        self.recordTriedSolution(self.curIndividual)
         self.curIndividualNum += 1
         if self.curIndividualNum < self.populationSize:
             self.curIndividual = self.curGenerationIndividuals[self.curIndividualNum]
@@ -212,7 +301,7 @@ class Optimizer:
 
         indexesOfIndividualsToKeep = list(range(numGoodToKeep))
         while numBadToKeep > 0:
-            badIndToKeepIndex = random.randint(numGoodToKeep,
+            badIndToKeepIndex = self.rng.randint(numGoodToKeep,
                                                len(self.keptIndividuals) - 1)  # Subtract 1 because randint is inclusive
             if badIndToKeepIndex not in indexesOfIndividualsToKeep:
                 indexesOfIndividualsToKeep.append(badIndToKeepIndex)
@@ -223,6 +312,9 @@ class Optimizer:
             if index not in indexesOfIndividualsToKeep:
                 del self.keptIndividuals[index]
 
+        if self.solutionsTriedBeforeFreezing is not None and self.geneImportance.numTrials >= self.freezeAfterTrials:
+            self.freezeUnimportantGenes()
+
         # Breeding section
         # Check to ensure there are enough remaining solutions before creating Individuals
         # otherwise we will stall indefinitely.
@@ -240,22 +332,23 @@ class Optimizer:
             self.keptIndividuals[index].chanceToBreed = chanceToBreed
 
         numIndividualsToCreate = self.populationSize
+        numSeenProposals = 0
         while numIndividualsToCreate > 0:
             motherIndex = None
             fatherIndex = None
             while True:
-                possibleMotherIndex = random.randint(0,
+                possibleMotherIndex = self.rng.randint(0,
                                                      numOfKeptIndividuals - 1)  # Subtract 1 because randint is inclusive
                 mothersChanceToBreed = self.keptIndividuals[possibleMotherIndex].chanceToBreed
-                randomNum = random.randint(0, 99)
+                randomNum = self.rng.randint(0, 99)
                 if randomNum < mothersChanceToBreed:
                     motherIndex = possibleMotherIndex
                     break
             while True:
-                possiblefatherIndex = random.randint(0,
+                possiblefatherIndex = self.rng.randint(0,
                                                      numOfKeptIndividuals - 1)  # Subtract 1 because randint is inclusive
                 fathersChanceToBreed = self.keptIndividuals[possiblefatherIndex].chanceToBreed
-                randomNum = random.randint(0, 99)
+                randomNum = self.rng.randint(0, 99)
                 if randomNum < fathersChanceToBreed:
                     fatherIndex = possiblefatherIndex
                     break
@@ -263,14 +356,53 @@ class Optimizer:
                 newIndividual = self.breedIndividuals(self.keptIndividuals[motherIndex],
                                                       self.keptIndividuals[fatherIndex])
                 newIndividualHash = newIndividual.getHash()
-                if newIndividualHash not in self.listOfHashes:
-                    self.listOfHashes.append(newIndividualHash)
+                if newIndividualHash in self.seenSet:
+                    numSeenProposals += 1
+                    # An approximate seenSet can hide the last few solutions for good, so numPossibleSolutions is only an upper bound.
+                    # Rather than wait forever on solutions that can't be produced, treat the search space as used up.
+                    if not self.seenSet.isExact and numSeenProposals >= self.maxSeenProposalsBeforeExhausted:
+                        print("No unseen solution found in " + str(
+                            numSeenProposals) + " attempts.  Treating the search space as exhausted.")
+                        self.populationSize = len(self.curGenerationIndividuals)
+                        self.numPossibleSolutions = self.populationSize
+                        break
+                else:
+                    numSeenProposals = 0
+                    self.seenSet.add(newIndividualHash)
+                    if not self.isFeasible(newIndividual):
+                        # Infeasible solutions leave the search space, so make sure we don't wait on ones that aren't there.
+                        self.recordTriedSolution(newIndividual)
+                        self.numPossibleSolutions -= 1
+                        numUnusedSolutions = self.numPossibleSolutions - len(self.curGenerationIndividuals)
+                        if numIndividualsToCreate > numUnusedSolutions:
+                            numIndividualsToCreate = numUnusedSolutions
+                            self.populationSize = len(self.curGenerationIndividuals) + numIndividualsToCreate
+                        continue
                     self.curGenerationIndividuals.append(newIndividual)
                     numIndividualsToCreate -= 1
+        # Every remaining solution failed the constraints, or could not be produced.
+        if len(self.curGenerationIndividuals) == 0:
+            return True, self.numGenerationsCompleted, self.bestScore, self.bestArtifact
         self.curIndividual = self.curGenerationIndividuals[0]
         self.numGenerationsCompleted += 1
         return False, self.numGenerationsCompleted, self.bestScore, self.bestArtifact
 
+    def createDesignIndividuals(self, numIndividuals: int):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        labels = list(self.requestedGenes)
+        numParamsPerGene = [self.requestedGenes[label].getNumParameters() for label in labels]
+        individuals = []
+        for indexes in createDesign(numParamsPerGene, numIndividuals, self.initialization, self.rng):
+            newIndividual = Individual()
+            for label, index in zip(labels, indexes):
+                newGene = deepcopy(self.requestedGenes[label])
+                newGene.setValueByIndex(index)
+                newIndividual.genes[label] = newGene
+            individuals.append(newIndividual)
+        return individuals
+
     def breedIndividuals(self, mother, father):
         """
         NOT FOR EXTERNAL USE.
@@ -279,9 +411,11 @@ class Optimizer:
         motherGenes = mother.genes
         fatherGenes = father.genes
         for k in motherGenes:
-            geneToCopy = random.choice([motherGenes[k], fatherGenes[k]])
+            geneToCopy = self.rng.choice([motherGenes[k], fatherGenes[k]])
             copiedGene = deepcopy(geneToCopy)
             newIndividual.genes[k] = copiedGene
+        for k in self.frozenGenes:
+            newIndividual.genes[k] = deepcopy(self.frozenGenes[k])
         self.mutateIndividual(newIndividual)  # Possibly mutate the newIndividual
         return newIndividual
 
@@ -289,13 +423,107 @@ class Optimizer:
         """
         NOT FOR EXTERNAL USE.
         """
-        randomNumber = random.randint(0, 99)
+        randomNumber = self.rng.randint(0, 99)
         if randomNumber < self.curMutationChance:
-            numGenesInIndividual = len(individual.genes)
-            numGenesToMutate = random.randint(1, numGenesInIndividual)
-            listOfGenesToMutate = random.sample(list(individual.genes.values()), numGenesToMutate)
+            mutableGenes = [individual.genes[k] for k in individual.genes if k not in self.frozenGenes]
+            numGenesInIndividual = len(mutableGenes)
+            numGenesToMutate = self.rng.randint(1, numGenesInIndividual)
+            listOfGenesToMutate = self.rng.sample(mutableGenes, numGenesToMutate)
             for gene in listOfGenesToMutate:
-                gene.mutate()
+                gene.mutate(self.rng)
+
+    def recordTriedSolution(self, individual):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        if self.solutionsTriedBeforeFreezing is None:
+            return
+        hashableValues = {}
+        for key in individual.genes:
+            hashableValues[key] = individual.genes[key].getHashableValue()
+        self.solutionsTriedBeforeFreezing.append(hashableValues)
+
+    def freezeUnimportantGenes(self):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        triedSolutions = self.solutionsTriedBeforeFreezing
+        self.solutionsTriedBeforeFreezing = None
+        if self.bestGenes is None:
+            return
+        importance = self.geneImportance.getImportance()
+        # A low estimate only means a gene doesn't matter if there is evidence behind it.  With too few or all equal scores
+        # every gene looks unimportant, and freezing on that would throw away most of the search space for nothing.
+        labelsWithEvidence = [label for label in self.requestedGenes if self.geneImportance.hasEvidence(label)]
+        if len(labelsWithEvidence) == 0:
+            print("Not freezing genes.  The scores so far don't show which genes matter.")
+            return
+        # Least important first.  The most important gene is never frozen, so there is always something left to optimize.
+        labelsByImportance = sorted(self.requestedGenes, key=lambda label: importance.get(label, 0.0))
+        labelsToFreeze = [label for label in labelsByImportance[:-1]
+                          if label in labelsWithEvidence and importance.get(label, 0.0) < self.freezeImportanceThreshold]
+        if len(labelsToFreeze) == 0:
+            return
+
+        # Recount the remaining search space: everything the unfrozen genes can do, minus what was already tried with the frozen values.
+        numPossibleSolutions = 1
+        for label in self.requestedGenes:
+            if label not in labelsToFreeze:
+                numPossibleSolutions *= self.requestedGenes[label].getNumParameters()
+        for hashableValues in triedSolutions:
+            if all(hashableValues[label] == self.bestGenes[label].getHashableValue() for label in labelsToFreeze):
+                numPossibleSolutions -= 1
+        if numPossibleSolutions < self.populationSize:
+            print("Not freezing genes.  Only " + str(numPossibleSolutions) + " possible solutions would remain.")
+            return
+
+        for label in labelsToFreeze:
+            self.frozenGenes[label] = deepcopy(self.bestGenes[label])
+            self.importanceWhenFrozen[label] = importance.get(label, 0.0)
+        self.numPossibleSolutions = numPossibleSolutions
+        print("Froze genes " + str(labelsToFreeze) + " at their best values.  Possible solutions remaining: " + str(
+            self.numPossibleSolutions))
+
+    def getGeneImportance(self):
+        """
+        Returns how much each gene has affected the score so far, and whether it has been frozen.
+        An importance is the fraction of the score's variance explained by the gene, between 0 and 1.  See GeneImportance.
+        A frozen gene reports the importance it was frozen on, as once frozen its single value says nothing more about the score.
+        :return: A dictionary keyed by gene label, holding dictionaries with "importance" and "frozen" keys
+        """
+        importance = self.geneImportance.getImportance()
+        report = {}
+        for label in self.requestedGenes:
+            if label in self.frozenGenes:
+                report[label] = {"importance": self.importanceWhenFrozen[label], "frozen": True}
+            else:
+                report[label] = {"importance": importance.get(label, 0.0), "frozen": False}
+        return report
+
+    def isFeasible(self, individual):
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        if len(self.constraints) == 0:
+            return True
+        self.numConstraintChecks += 1
+        dictOfValues = {}
+        for key in individual.genes:
+            dictOfValues[key] = individual.genes[key].value
+        for constraint in self.constraints:
+            if not constraint(dictOfValues):
+                self.numConstraintRejections += 1
+                return False
+        return True
+
+    def getConstraintRejectionRate(self):
+        """
+        Returns the fraction of generated solutions that failed the constraints added with addConstraint.
+        :return: A float between 0 and 1.  0 if no solutions have been checked yet.
+        """
+        if self.numConstraintChecks == 0:
+            return 0.0
+        return self.numConstraintRejections / self.numConstraintChecks
 
     def getBestParameters(self):
         """
@@ -310,6 +538,29 @@ class Optimizer:
             dictOfValues[key] = value
         return dictOfValues
 
+    def spawnRng(self, *streamPath):
+        """
+        Creates a random stream of its own, derived from this Optimizer's seed, for work done on its behalf.
+        IE one per worker, thread or island generating candidates in parallel.  Streams with different paths are independent,
+        and the same path always gives the same stream, so parallel work replays exactly when the seed is reused.
+
+        Example:
+        workerRngs = [myOptimizer.spawnRng("worker", workerNum) for workerNum in range(4)]
+
+        :param streamPath: Any number of strings or integers naming the stream
+        :return: A random.Random instance
+        """
+        # Spawned streams get a namespace of their own, so no path can hand out a copy of the Optimizer's own stream.
+        return createRng(self.seed, "spawn", *streamPath)
+
+    def getSeenSetStats(self):
+        """
+        Returns a dictionary of statistics about the record of previously generated solutions.
+        See ExactSeenSet.getStats and BloomSeenSet.getStats.
+        :return: A dictionary of statistics, including occupancy and the estimated false positive rate
+        """
+        return self.seenSet.getStats()
+
 
 class Individual:
     """
@@ -326,8 +577,9 @@ class Individual:
         for key in self.genes:
             curGene = self.genes[key]
             hashableValue = curGene.getHashableValue()
-            stringToHash += hashableValue
-        hashOfValues = hash(stringToHash)
+            stringToHash += hashableValue + "|"
+        # Python's own hash() of a string changes from process to process, which would break resuming a pickled Optimizer.
+        hashOfValues = int.from_bytes(blake2b(stringToHash.encode(), digest_size=8).digest(), "little")
         return hashOfValues
 
 
@@ -339,8 +591,8 @@ class GeneBool:
     def __init__(self):
         self.value = random.choice([True, False])
 
-    def mutate(self):
-        self.value = random.choice([True, False])
+    def mutate(self, rng: random.Random = random):
+        self.value = rng.choice([True, False])
 
     def getHashableValue(self) -> str:
         return str(self.value)
@@ -348,6 +600,12 @@ class GeneBool:
     def getNumParameters(self):
         return 2
 
+    def getImportanceLevel(self, numBins: int):
+        return self.value
+
+    def setValueByIndex(self, index: int):
+        self.value = [False, True][index]
+
 
 class GeneInt:
     """
@@ -360,8 +618,8 @@ class GeneInt:
         self.max = max
         self.value = random.randint(self.min, self.max)
 
-    def mutate(self):
-        self.value = random.randint(self.min, self.max)
+    def mutate(self, rng: random.Random = random):
+        self.value = rng.randint(self.min, self.max)
 
     def getHashableValue(self) -> str:
         return str(self.value)
@@ -369,6 +627,15 @@ class GeneInt:
     def getNumParameters(self):
         return (self.max - self.min) + 1
 
+    def getImportanceLevel(self, numBins: int):
+        numParams = self.getNumParameters()
+        if numParams <= numBins:
+            return self.value
+        return floor((self.value - self.min) * numBins / numParams)
+
+    def setValueByIndex(self, index: int):
+        self.value = self.min + index
+
 
 class GeneFloat:
     """
@@ -383,16 +650,27 @@ class GeneFloat:
         self.value = round(random.uniform(self.min, self.max),
                            self.numDecimalPlaces)  # The rounding makes the max value inclusive
 
-    def mutate(self):
-        self.value = round(random.uniform(self.min, self.max), self.numDecimalPlaces)
+    def mutate(self, rng: random.Random = random):
+        self.value = round(rng.uniform(self.min, self.max), self.numDecimalPlaces)
 
     def getHashableValue(self) -> str:
-        return str(self.value)
+        # The step number rather than the value, as str() tells apart values that are equal, IE -0.0 and 0.0.
+        return str(round((self.value - self.min) * (10 ** self.numDecimalPlaces)))
 
     def getNumParameters(self):
         numParams = ((self.max * (10 ** self.numDecimalPlaces)) - (self.min * (10 ** self.numDecimalPlaces))) + 1
         return numParams
 
+    def getImportanceLevel(self, numBins: int):
+        numParams = self.getNumParameters()
+        stepNum = round((self.value - self.min) * (10 ** self.numDecimalPlaces))
+        if numParams <= numBins:
+            return stepNum
+        return min(numBins - 1, floor(stepNum * numBins / numParams))
+
+    def setValueByIndex(self, index: int):
+        self.value = round(self.min + index / (10 ** self.numDecimalPlaces), self.numDecimalPlaces)
+
 
 class GeneChoice:
     """
@@ -409,8 +687,8 @@ class GeneChoice:
         self.choices = choices
         self.value = random.choice(self.choices)
 
-    def mutate(self):
-        self.value = random.choice(self.choices)
+    def mutate(self, rng: random.Random = random):
+        self.value = rng.choice(self.choices)
 
     def getHashableValue(self) -> str:
         indexOfCurrentValue = self.choices.index(self.value)
@@ -419,4 +697,10 @@ class GeneChoice:
     def getNumParameters(self):
         return len(self.choices)
 
+    def getImportanceLevel(self, numBins: int):
+        return self.choices.index(self.value)
+
+    def setValueByIndex(self, index: int):
+        self.value = self.choices[index]
+
 
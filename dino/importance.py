@@ -0,0 +1,119 @@
+"""
+copyright 2018 Preston R. Labig
+"""
+from math import isfinite
+
+
+class GeneImportance:
+    """
+    Estimates how much each gene affects the score, from the scores the optimizer has been given.
+
+    Each gene's values are split into levels.  Bools and choices use their values directly, while ints and floats
+    are binned into numBins equal width ranges.  A gene's importance is the fraction of the score's variance
+    explained by its levels.  0 means the gene's level tells you nothing about the score, and 1 means it explains all of it.
+    This uses epsilon squared rather than the plain correlation ratio, as the latter credits every gene with
+    roughly (levels - 1) / trials of importance by chance alone, which would keep irrelevant genes from ever being frozen.
+
+    Only running sums are kept, so memory does not grow with the number of trials.
+    Scores of Infinity, IE failed runs, are counted as trials but left out of the estimate.
+
+    An importance of 0 can mean either that a gene does not matter, or that there is nothing yet to tell.
+    Use hasEvidence to tell the two apart before acting on an estimate.
+    """
+
+    def __init__(self, numBins: int = 5, minScoresPerLevel: int = 3):
+        """
+        :param numBins: How many ranges GeneInt and GeneFloat values are split into
+        :param minScoresPerLevel: How many scores a level needs before it counts as evidence.  See hasEvidence.
+        """
+        self.numBins: int = numBins
+        self.minScoresPerLevel: int = minScoresPerLevel
+        self.numTrials: int = 0
+        self.numScored: int = 0
+        self.scoreSum: float = 0.0
+        self.scoreSumOfSquares: float = 0.0
+        self.levelStats: dict = {}
+
+    def record(self, genes: dict, score: float):
+        """
+        Records the score a solution received.
+
+        :param genes: The genes of the scored Individual, keyed by label
+        :param score: The score the solution received
+        :return: Nothing
+        """
+        self.numTrials += 1
+        if not isfinite(score):
+            return
+        self.numScored += 1
+        self.scoreSum += score
+        self.scoreSumOfSquares += score * score
+        for label in genes:
+            level = genes[label].getImportanceLevel(self.numBins)
+            geneLevelStats = self.levelStats.setdefault(label, {})
+            stats = geneLevelStats.setdefault(level, [0, 0.0])
+            stats[0] += 1
+            stats[1] += score
+
+    def getImportance(self) -> dict:
+        """
+        Returns the estimated importance of each gene that has been recorded.
+
+        :return: A dictionary of importances between 0 and 1, keyed by gene label
+        """
+        importance = {}
+        totalSumOfSquares = self.getTotalSumOfSquares()
+        if self.numScored < 2:
+            for label in self.levelStats:
+                importance[label] = 0.0
+            return importance
+        meanScore = self.scoreSum / self.numScored
+        for label in self.levelStats:
+            if totalSumOfSquares <= 0:
+                importance[label] = 0.0
+                continue
+            geneLevelStats = self.levelStats[label]
+            numLevels = len(geneLevelStats)
+            if numLevels < 2 or numLevels >= self.numScored:
+                importance[label] = 0.0
+                continue
+            betweenSumOfSquares = 0.0
+            for count, levelScoreSum in geneLevelStats.values():
+                levelMean = levelScoreSum / count
+                betweenSumOfSquares += count * (levelMean - meanScore) ** 2
+            withinMeanSquare = max(0.0, totalSumOfSquares - betweenSumOfSquares) / (self.numScored - numLevels)
+            correctedSumOfSquares = betweenSumOfSquares - (numLevels - 1) * withinMeanSquare
+            importance[label] = min(1.0, max(0.0, correctedSumOfSquares / totalSumOfSquares))
+        return importance
+
+    def hasEvidence(self, label: str) -> bool:
+        """
+        Returns whether the gene's importance estimate rests on enough data to act on.
+
+        That takes scores that are not all the same, and at least two of the gene's levels
+        that have each been scored at least minScoresPerLevel times.
+
+        :param label: The gene's label
+        :return: True if the estimate is informative
+        """
+        if self.getTotalSumOfSquares() <= 0:
+            return False
+        geneLevelStats = self.levelStats.get(label, {})
+        numWellScoredLevels = 0
+        for count, _ in geneLevelStats.values():
+            if count >= self.minScoresPerLevel:
+                numWellScoredLevels += 1
+        return numWellScoredLevels >= 2 and len(geneLevelStats) < self.numScored
+
+    def getTotalSumOfSquares(self) -> float:
+        """
+        NOT FOR EXTERNAL USE.
+        """
+        if self.numScored < 2:
+            return 0.0
+        meanScore = self.scoreSum / self.numScored
+        totalSumOfSquares = self.scoreSumOfSquares - self.numScored * meanScore * meanScore
+        # Equal scores can leave a tiny positive remainder from rounding.  That is not variance.
+        if totalSumOfSquares <= 1e-12 * self.scoreSumOfSquares:
+            return 0.0
+        return totalSumOfSquares
@@ -0,0 +1,197 @@
+"""
+copyright 2018 Preston R. Labig
+"""
+import random
+from math import floor
+
+INITIALIZATION_METHODS = ("random", "latinHypercube", "halton")
+
+
+def createDesign(numParamsPerGene: list, numPoints: int, method: str, rng: random.Random = random) -> list:
+    """
+    Creates a space-filling set of unique solutions.
+
+    Each solution is a list holding one value index per gene, between 0 and that gene's number of parameters, exclusive.
+    "latinHypercube" splits every gene's range into numPoints equal strata and uses each stratum exactly once.
+    "halton" uses a randomly shifted Halton sequence, which spreads the points out evenly across all genes at once.
+    "random" draws the points independently.
+    Genes with fewer parameters than numPoints, such as bools and short choice lists, see each of their values
+    used the same number of times, give or take one, under "latinHypercube".
+
+    Uniqueness is guaranteed.  Each gene's values are drawn on their own, so two solutions can come out the same.
+    Such a solution is repaired by swapping gene values with other solutions.  That leaves every gene with exactly
+    the values it was drawn with, so the strata are kept.  Only if no swaps work, which can happen when numPoints
+    is close to the size of the search space, is the solution moved to an unused one.
+
+    :param numParamsPerGene: The result of getNumParameters() for each gene, in order
+    :param numPoints: The number of solutions to create
+    :param method: One of INITIALIZATION_METHODS
+    :param rng: The random stream to draw from.  Optimizers pass their own, so designs are reproducible.
+    :return: A list of numPoints lists of value indexes
+    """
+    if method not in INITIALIZATION_METHODS:
+        raise Exception("Unknown initialization method " + str(method) + ".  Choose one of " + str(INITIALIZATION_METHODS) + ".")
+    numPossibleSolutions = 1
+    for numParams in numParamsPerGene:
+        numPossibleSolutions *= numParams
+    if numPossibleSolutions < numPoints:
+        raise Exception("FATAL: Cannot create " + str(numPoints) + " unique solutions from a search space of " + str(
+            numPossibleSolutions) + " possible solutions.")
+    numGenes = len(numParamsPerGene)
+    if method == "latinHypercube":
+        design = _createLatinHypercube(numParamsPerGene, numPoints, rng)
+    else:
+        design = []
+        for unitPoint in _createUnitPoints(numGenes, numPoints, method, rng):
+            indexes = []
+            for geneNum in range(numGenes):
+                indexes.append(min(numParamsPerGene[geneNum] - 1, floor(unitPoint[geneNum] * numParamsPerGene[geneNum])))
+            design.append(indexes)
+
+    usedSolutions = set()
+    duplicatePointNums = []
+    for pointNum in range(numPoints):
+        solution = tuple(design[pointNum])
+        if solution in usedSolutions:
+            duplicatePointNums.append(pointNum)
+        else:
+            usedSolutions.add(solution)
+    duplicatePointNumSet = set(duplicatePointNums)
+    uniquePointNums = [pointNum for pointNum in range(numPoints) if pointNum not in duplicatePointNumSet]
+    for pointNum in duplicatePointNums:
+        if not _swapIntoUnusedSolution(design, pointNum, uniquePointNums, usedSolutions, rng):
+            _moveToUnusedSolution(design, pointNum, numParamsPerGene, numPossibleSolutions, usedSolutions, rng)
+        uniquePointNums.append(pointNum)
+    return design
+
+
+def _swapIntoUnusedSolution(design: list, pointNum: int, uniquePointNums: list, usedSolutions: set, rng: random.Random) -> bool:
+    """
+    NOT FOR EXTERNAL USE.
+    """
+    numGenes = len(design[pointNum])
+    for otherPointNum in rng.sample(uniquePointNums, len(uniquePointNums)):
+        for geneNum in rng.sample(range(numGenes), numGenes):
+            if design[pointNum][geneNum] == design[otherPointNum][geneNum]:
+                continue
+            newSolution = list(design[pointNum])
+            newSolution[geneNum] = design[otherPointNum][geneNum]
+            newOtherSolution = list(design[otherPointNum])
+            newOtherSolution[geneNum] = design[pointNum][geneNum]
+            newSolution = tuple(newSolution)
+            newOtherSolution = tuple(newOtherSolution)
+            if newSolution in usedSolutions or newOtherSolution in usedSolutions or newSolution == newOtherSolution:
+                continue
+            usedSolutions.remove(tuple(design[otherPointNum]))
+            usedSolutions.add(newSolution)
+            usedSolutions.add(newOtherSolution)
+            design[pointNum] = list(newSolution)
+            design[otherPointNum] = list(newOtherSolution)
+            return True
+
+    # In a crowded search space no single swap may do.  Keep swapping at random while the other solution stays unique,
+    # which moves the duplicate around until it lands somewhere unused.
+    for _ in range(20 * len(uniquePointNums) * numGenes):
+        otherPointNum = rng.choice(uniquePointNums)
+        geneNum = rng.randrange(numGenes)
+        if design[pointNum][geneNum] == design[otherPointNum][geneNum]:
+            continue
+        newOtherSolution = list(design[otherPointNum])
+        newOtherSolution[geneNum] = design[pointNum][geneNum]
+        newOtherSolution = tuple(newOtherSolution)
+        if newOtherSolution in usedSolutions:
+            continue
+        usedSolutions.remove(tuple(design[otherPointNum]))
+        usedSolutions.add(newOtherSolution)
+        design[pointNum][geneNum] = design[otherPointNum][geneNum]
+        design[otherPointNum] = list(newOtherSolution)
+        if tuple(design[pointNum]) not in usedSolutions:
+            usedSolutions.add(tuple(design[pointNum]))
+            return True
+    return False
+
+
+def _moveToUnusedSolution(design: list, pointNum: int, numParamsPerGene: list, numPossibleSolutions: int,
+                          usedSolutions: set, rng: random.Random):
+    """
+    NOT FOR EXTERNAL USE.
+    """
+    # Step through the search space from a random solution.  There is always an unused one, so this ends.
+    solutionNum = rng.randrange(numPossibleSolutions)
+    while True:
+        solution = []
+        remainder = solutionNum
+        for numParams in numParamsPerGene:
+            solution.append(remainder % numParams)
+            remainder //= numParams
+        solution = tuple(solution)
+        if solution not in usedSolutions:
+            usedSolutions.add(solution)
+            design[pointNum] = list(solution)
+            return
+        solutionNum = (solutionNum + 1) % numPossibleSolutions
+
+
+def _createLatinHypercube(numParamsPerGene: list, numPoints: int, rng: random.Random) -> list:
+    """
+    NOT FOR EXTERNAL USE.
+    """
+    design = [[0] * len(numParamsPerGene) for _ in range(numPoints)]
+    for geneNum, numParams in enumerate(numParamsPerGene):
+        strata = rng.sample(range(numPoints), numPoints)
+        for pointNum in range(numPoints):
+            # Each stratum owns its own run of values, so a gene with fewer values than points gives every value
+            # the same number of strata, give or take one.
+            firstIndex = floor(strata[pointNum] * numParams / numPoints)
+            endIndex = floor((strata[pointNum] + 1) * numParams / numPoints)
+            if endIndex > firstIndex + 1:
+                design[pointNum][geneNum] = rng.randrange(firstIndex, endIndex)
+            else:
+                design[pointNum][geneNum] = firstIndex
+    return design
+
+
+def _createUnitPoints(numGenes: int, numPoints: int, method: str, rng: random.Random) -> list:
+    """
+    NOT FOR EXTERNAL USE.
+    """
+    unitPoints = [[0.0] * numGenes for _ in range(numPoints)]
+    if method == "halton":
+        # A random shift per gene and a random starting point keep separate runs from trying the same solutions.
+        bases = _getPrimes(numGenes)
+        shifts = [rng.random() for _ in range(numGenes)]
+        startIndex = rng.randint(1, 1000)
+        for pointNum in range(numPoints):
+            for geneNum in range(numGenes):
+                unitPoints[pointNum][geneNum] = (_radicalInverse(startIndex + pointNum, bases[geneNum]) + shifts[geneNum]) % 1
+    else:
+        for pointNum in range(numPoints):
+            for geneNum in range(numGenes):
+                unitPoints[pointNum][geneNum] = rng.random()
+    return unitPoints
+
+
+def _radicalInverse(index: int, base: int) -> float:
+    """
+    NOT FOR EXTERNAL USE.
+    """
+    result = 0.0
+    fraction = 1.0 / base
+    while index > 0:
+        result += (index % base) * fraction
+        index //= base
+        fraction /= base
+    return result
+
+
+def _getPrimes(numPrimes: int) -> list:
+    """
+    NOT FOR EXTERNAL USE.
+    """
+    primes = []
+    candidate = 2
+    while len(primes) < numPrimes:
+        if all(candidate % prime != 0 for prime in primes):
+            primes.append(candidate)
+        candidate += 1
+    return primes
@@ -0,0 +1,45 @@
+"""
+copyright 2018 Preston R. Labig
+"""
+import random
+from hashlib import blake2b
+
+
+def createRootSeed() -> int:
+    """
+    Draws a fresh root seed from the operating system, for optimizers that were not given one.
+
+    :return: A 64 bit integer seed
+    """
+    return random.SystemRandom().getrandbits(64)
+
+
+def deriveSeed(rootSeed: int, *streamPath) -> int:
+    """
+    Derives the seed of an independent random stream from a root seed.
+
+    The same root seed and stream path always give the same seed, in any process, and different paths give
+    unrelated seeds.  This lets every optimizer, and anything an optimizer hands work to, own its own stream
+    while a whole run can still be replayed from the one root seed.
+
+    Example:
+    deriveSeed(1234, "optimizer")
+    deriveSeed(1234, "worker", 3)
+
+    :param rootSeed: The root seed of the run
+    :param streamPath: Any number of strings or integers naming the stream
+    :return: A 64 bit integer seed
+    """
+    pathString = str(rootSeed) + "/" + "/".join(str(part) for part in streamPath)
+    return int.from_bytes(blake2b(pathString.encode(), digest_size=8).digest(), "little")
+
+
+def createRng(rootSeed: int, *streamPath) -> random.Random:
+    """
+    Creates an independent random stream.  See deriveSeed.
+
+    :param rootSeed: The root seed of the run
+    :param streamPath: Any number of strings or integers naming the stream
+    :return: A random.Random instance
+    """
+    return random.Random(deriveSeed(rootSeed, *streamPath))
@@ -0,0 +1,279 @@
+"""
+copyright 2018 Preston R. Labig
+"""
+import warnings
+from hashlib import blake2b
+from math import ceil, log
+
+
+class ExactSeenSet:
+    """
+    Records every solution hash that has been seen, along with its score once it has one.
+
+    This is the default backend for both optimizers.  It never reports a false positive, but
+    its memory use grows with every solution that is tried.
+    """
+
+    # Whether membership answers can be trusted completely.  Optimizers only count down the search space exactly when they can.
+    isExact: bool = True
+
+    def __init__(self):
+        self.scores: dict = {}
+
+    def add(self, solutionHash: int, score: float = None):
+        """
+        Records a solution hash as seen.
+
+        :param solutionHash: The value returned by Individual.getHash()
+        :param score: The score the solution received, if it has been scored
+        :return: Nothing
+        """
+        if score is not None or solutionHash not in self.scores:
+            self.scores[solutionHash] = score
+
+    def getScore(self, solutionHash: int):
+        """
+        Returns the recorded score of a solution, or None if it was never seen or never scored.
+
+        :param solutionHash: The value returned by Individual.getHash()
+        :return: The score, or None
+        """
+        return self.scores.get(solutionHash)
+
+    def createEmptyCopy(self):
+        """
+        Returns a new, empty seen-set of the same kind, for keeping a separate record.  IE of infeasible solutions.
+
+        :return: An empty ExactSeenSet
+        """
+        return ExactSeenSet()
+
+    def __contains__(self, solutionHash: int) -> bool:
+        return solutionHash in self.scores
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def getStats(self) -> dict:
+        """
+        Returns a dictionary describing the current state of the seen-set.
+
+        :return: A dictionary of statistics.  The false positive rate is always 0 for this backend.
+        """
+        return {
+            "backend": "exact",
+            "numItems": len(self.scores),
+            "capacity": None,
+            "occupancy": None,
+            "memoryBytes": None,
+            "targetFalsePositiveRate": 0.0,
+            "estimatedFalsePositiveRate": 0.0,
+            "saturated": False,
+        }
+
+
+class BloomSeenSet:
+    """
+    Records solution hashes in a scalable Bloom filter with a bounded memory budget.
+
+    Meant for very long runs against cheap objectives, where keeping every hash is not an option.
+    A hash that has been added is always reported as seen, but a hash that has not been added may
+    occasionally be reported as seen too, in which case the optimizer skips that solution.
+    Unlike ExactSeenSet it does not keep scores, so the annealing optimizer cannot reuse them.
+
+    The filter starts with room for initialCapacity hashes.  Each time it fills up, a new, larger filter
+    with a tighter error rate is stacked on top, so the overall false positive rate stays under
+    falsePositiveRate.  Once adding a new filter would go over maxMemoryBytes, the last filter keeps
+    taking hashes and the false positive rate is allowed to climb.  getStats() reports the estimate.
+    When the estimate passes saturationFalsePositiveRate the filter is saturated.  A warning is issued once.
+    From then on most new solutions look seen, and the optimizers will treat the search space as used up.
+
+    Example:
+    optimizer = Optimizer(populationSize=100, seenSet=BloomSeenSet(falsePositiveRate=0.001, maxMemoryBytes=2 ** 24))
+    """
+
+    isExact: bool = False
+
+    def __init__(self, initialCapacity: int = 100000, falsePositiveRate: float = 0.001,
+                 maxMemoryBytes: int = None, growthFactor: int = 2, tighteningRatio: float = 0.5,
+                 saturationFalsePositiveRate: float = 0.5):
+        """
+        :param initialCapacity: The number of hashes the first filter is sized for
+        :param falsePositiveRate: The target false positive rate, between 0 and 1, exclusive
+        :param maxMemoryBytes: The most memory the filters' bits may use.  None means unbounded.
+        :param growthFactor: How much larger each new filter is than the last
+        :param tighteningRatio: How much smaller each new filter's error rate is than the last, between 0 and 1, exclusive
+        :param saturationFalsePositiveRate: The estimated false positive rate, once memory runs out, at which the filter counts as saturated
+        """
+        if initialCapacity < 1:
+            raise Exception("initialCapacity must be at least 1")
+        if not 0 < falsePositiveRate < 1:
+            raise Exception("falsePositiveRate must be between 0 and 1, exclusive")
+        if growthFactor < 1:
+            raise Exception("growthFactor must be at least 1")
+        if not 0 < tighteningRatio < 1:
+            raise Exception("tighteningRatio must be between 0 and 1, exclusive")
+        self.initialCapacity: int = initialCapacity
+        self.falsePositiveRate: float = falsePositiveRate
+        self.maxMemoryBytes: int = maxMemoryBytes
+        self.growthFactor: int = growthFactor
+        self.tighteningRatio: float = tighteningRatio
+        self.saturationFalsePositiveRate: float = saturationFalsePositiveRate
+        self.numItems: int = 0
+        self.filters: list = []
+        self.isAtMemoryLimit: bool = False
+        self.saturated: bool = False
+        # The per filter error rates form a geometric series that sums to falsePositiveRate.
+        firstFilter = _BloomFilter(initialCapacity, falsePositiveRate * (1 - tighteningRatio))
+        if maxMemoryBytes is not None and firstFilter.getMemoryBytes() > maxMemoryBytes:
+            raise Exception("FATAL: A Bloom filter for " + str(initialCapacity) + " solutions at a false positive rate of " + str(
+                falsePositiveRate) + " needs " + str(firstFilter.getMemoryBytes()) + " bytes, which is more than maxMemoryBytes of " + str(
+                maxMemoryBytes) + ".  Either raise maxMemoryBytes, lower initialCapacity, or raise falsePositiveRate.")
+        self.filters.append(firstFilter)
+
+    def add(self, solutionHash: int, score: float = None):
+        """
+        Records a solution hash as seen.
+
+        :param solutionHash: The value returned by Individual.getHash()
+        :param score: Accepted for compatibility with ExactSeenSet.  A Bloom filter cannot store scores.
+        :return: Nothing
+        """
+        lastFilter = self.filters[-1]
+        if lastFilter.numItems >= lastFilter.capacity and not self.isAtMemoryLimit:
+            newFilter = _BloomFilter(lastFilter.capacity * self.growthFactor,
+                                     lastFilter.falsePositiveRate * self.tighteningRatio)
+            if self.maxMemoryBytes is None or self.getMemoryBytes() + newFilter.getMemoryBytes() <= self.maxMemoryBytes:
+                self.filters.append(newFilter)
+                lastFilter = newFilter
+            else:
+                self.isAtMemoryLimit = True
+        lastFilter.add(_getIndexSeeds(solutionHash))
+        self.numItems += 1
+        if self.isAtMemoryLimit and not self.saturated:
+            if self.getEstimatedFalsePositiveRate() >= self.saturationFalsePositiveRate:
+                self.saturated = True
+                warnings.warn("BloomSeenSet is saturated.  Its estimated false positive rate has reached " + str(
+                    round(self.getEstimatedFalsePositiveRate(), 3)) + " after " + str(
+                    self.numItems) + " solutions, so most new solutions will look already seen.  Raise maxMemoryBytes or falsePositiveRate.")
+
+    def getScore(self, solutionHash: int):
+        """
+        Always returns None.  A Bloom filter only knows whether a solution was probably seen, not its score.
+        """
+        return None
+
+    def createEmptyCopy(self):
+        """
+        Returns a new, empty seen-set of the same kind, for keeping a separate record.  IE of infeasible solutions.
+        It has the same settings, including its own maxMemoryBytes budget.
+
+        :return: An empty BloomSeenSet
+        """
+        return BloomSeenSet(self.initialCapacity, self.falsePositiveRate, self.maxMemoryBytes, self.growthFactor,
+                            self.tighteningRatio, self.saturationFalsePositiveRate)
+
+    def __contains__(self, solutionHash: int) -> bool:
+        return self._containsSeeds(_getIndexSeeds(solutionHash))
+
+    def __len__(self) -> int:
+        return self.numItems
+
+    def _containsSeeds(self, indexSeeds: tuple) -> bool:
+        for bloomFilter in self.filters:
+            if bloomFilter.contains(indexSeeds):
+                return True
+        return False
+
+    def getEstimatedFalsePositiveRate(self) -> float:
+        chanceOfNoFalsePositive = 1.0
+        for bloomFilter in self.filters:
+            chanceOfNoFalsePositive *= 1 - bloomFilter.getEstimatedFalsePositiveRate()
+        return 1 - chanceOfNoFalsePositive
+
+    def getMemoryBytes(self) -> int:
+        memoryBytes = 0
+        for bloomFilter in self.filters:
+            memoryBytes += bloomFilter.getMemoryBytes()
+        return memoryBytes
+
+    def getStats(self) -> dict:
+        """
+        Returns a dictionary describing the current state of the seen-set.
+
+        "numItems" is the number of hashes added, including any that already looked seen.
+        "occupancy" is the fraction of all filter bits that are set.  "estimatedFalsePositiveRate" is the chance
+        that a never before seen solution is reported as seen, estimated from how full each filter currently is.
+
+        :return: A dictionary of statistics
+        """
+        capacity = 0
+        numBits = 0
+        numBitsSet = 0
+        for bloomFilter in self.filters:
+            capacity += bloomFilter.capacity
+            numBits += bloomFilter.numBits
+            numBitsSet += bloomFilter.numBitsSet
+        return {
+            "backend": "bloom",
+            "numItems": self.numItems,
+            "numFilters": len(self.filters),
+            "capacity": capacity,
+            "occupancy": numBitsSet / numBits,
+            "memoryBytes": self.getMemoryBytes(),
+            "targetFalsePositiveRate": self.falsePositiveRate,
+            "estimatedFalsePositiveRate": self.getEstimatedFalsePositiveRate(),
+            "saturated": self.saturated,
+        }
+
+
+class _BloomFilter:
+    """
+    NOT FOR EXTERNAL USE.
+    """
+
+    def __init__(self, capacity: int, falsePositiveRate: float):
+        self.capacity: int = capacity
+        self.falsePositiveRate: float = falsePositiveRate
+        self.numBits: int = max(8, ceil(-capacity * log(falsePositiveRate) / (log(2) ** 2)))
+        self.numHashes: int = max(1, round((self.numBits / capacity) * log(2)))
+        self.bits: bytearray = bytearray(ceil(self.numBits / 8))
+        self.numBitsSet: int = 0
+        self.numItems: int = 0
+
+    def add(self, indexSeeds: tuple):
+        for bitIndex in self._getBitIndexes(indexSeeds):
+            byteIndex = bitIndex >> 3
+            mask = 1 << (bitIndex & 7)
+            if not self.bits[byteIndex] & mask:
+                self.bits[byteIndex] |= mask
+                self.numBitsSet += 1
+        self.numItems += 1
+
+    def contains(self, indexSeeds: tuple) -> bool:
+        for bitIndex in self._getBitIndexes(indexSeeds):
+            if not self.bits[bitIndex >> 3] & (1 << (bitIndex & 7)):
+                return False
+        return True
+
+    def _getBitIndexes(self, indexSeeds: tuple):
+        # Kirsch-Mitzenmacher double hashing.  Two base hashes stand in for numHashes independent ones.
+        firstSeed, secondSeed = indexSeeds
+        for hashNum in range(self.numHashes):
+            yield (firstSeed + hashNum * secondSeed) % self.numBits
+
+    def getEstimatedFalsePositiveRate(self) -> float:
+        return (self.numBitsSet / self.numBits) ** self.numHashes
+
+    def getMemoryBytes(self) -> int:
+        return len(self.bits)
+
+
+def _getIndexSeeds(solutionHash: int) -> tuple:
+    """
+    NOT FOR EXTERNAL USE.
+    """
+    digest = blake2b(str(solutionHash).encode(), digest_size=16).digest()
+    firstSeed = int.from_bytes(digest[:8], "little")
+    secondSeed = int.from_bytes(digest[8:], "little") | 1  # Never 0, so the probes never all land on the same bit
+    return firstSeed, secondSeed
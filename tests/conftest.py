@@ -0,0 +1,25 @@
+import os
+import signal
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def failOnHang():
+    # Several tests guard against optimizers looping forever.  Fail them instead of hanging the suite.
+    # SIGALRM only exists on POSIX.  Elsewhere the tests still run, just without the guard.
+    if not hasattr(signal, "SIGALRM"):
+        yield
+        return
+
+    def onTimeout(signum, frame):
+        raise TimeoutError("Test took longer than 60 seconds.  The optimizer is probably stuck in a loop.")
+
+    previousHandler = signal.signal(signal.SIGALRM, onTimeout)
+    signal.alarm(60)
+    yield
+    signal.alarm(0)
+    signal.signal(signal.SIGALRM, previousHandler)
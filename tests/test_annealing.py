@@ -0,0 +1,158 @@
+import pytest
+
+from dino import annealing
+from dino.seenset import BloomSeenSet
+
+
+def runUntilDone(optimizer, objective, maxTrials):
+    numTrials = 0
+    while numTrials < maxTrials:
+        numTrials += 1
+        done, _, _, _ = optimizer.next(objective(optimizer))
+        if done:
+            return numTrials
+    return numTrials
+
+
+def testUnreachableFeasibleNeighboursDoNotHang():
+    optimizer = annealing.Optimizer(minimumIterationsToRun=30, earlyStoppingIters=10, seed=1)
+    optimizer.addGene("b", annealing.GeneInt(0, 20))
+    optimizer.addConstraint(lambda params: params["b"] % 2 == 0)
+    optimizer.startTraining()
+    numTrials = 0
+    while numTrials < 1000:
+        numTrials += 1
+        assert optimizer.getGeneValue("b") % 2 == 0
+        done, _, _, _ = optimizer.next(1 + abs(optimizer.getGeneValue("b") - 7))
+        if done:
+            break
+    assert done
+    assert optimizer.bestScore == 2
+
+
+def testNoFeasibleStartRaises():
+    optimizer = annealing.Optimizer(seed=2, maxRejectedProposals=50)
+    optimizer.addGene("b", annealing.GeneInt(0, 20))
+    optimizer.addConstraint(lambda params: params["b"] > 100)
+    with pytest.raises(Exception, match="FATAL"):
+        optimizer.startTraining()
+
+
+def testInfeasibleSolutionsAreCheckedOnce():
+    numCalls = []
+
+    def constraint(params):
+        numCalls.append(params["b"])
+        return params["b"] % 3 == 0
+
+    optimizer = annealing.Optimizer(minimumIterationsToRun=50, earlyStoppingIters=10, seed=3)
+    optimizer.addGene("b", annealing.GeneInt(0, 30))
+    optimizer.addConstraint(constraint)
+    optimizer.startTraining()
+    runUntilDone(optimizer, lambda o: 1 + abs(o.getGeneValue("b") - 13), 1000)
+    rejected = [value for value in numCalls if value % 3 != 0]
+    assert len(rejected) == len(set(rejected))
+    assert optimizer.numConstraintChecks == len(numCalls)
+    assert optimizer.numConstraintRejections == len(rejected)
+
+
+
+def testFreezingAppliesToPendingProbes():
+    optimizer = annealing.Optimizer(minimumIterationsToRun=50, earlyStoppingIters=10, seed=5, freezeAfterTrials=12,
+                                    freezeImportanceThreshold=1.01, initialization="latinHypercube", numInitialProbes=16)
+    optimizer.addGene("noise", annealing.GeneChoice(["x", "y"]))
+    optimizer.addGene("signal", annealing.GeneInt(0, 50))
+    optimizer.startTraining()
+    triedSolutions = []
+    for _ in range(16):
+        for label in optimizer.frozenGenes:
+            assert optimizer.getGeneValue(label) == optimizer.frozenGenes[label].value
+        triedSolutions.append((optimizer.getGeneValue("noise"), optimizer.getGeneValue("signal")))
+        done, _, _, _ = optimizer.next(1 + optimizer.getGeneValue("signal"))
+        if done:
+            break
+    assert list(optimizer.frozenGenes) == ["noise"]
+    assert len(triedSolutions) == len(set(triedSolutions))
+
+
+def testFreezeUsesTheTriggeringTrialAsBest():
+    optimizer = annealing.Optimizer(seed=6, freezeAfterTrials=12, freezeImportanceThreshold=1.01)
+    optimizer.addGene("a", annealing.GeneChoice(["x", "y"]))
+    optimizer.addGene("b", annealing.GeneInt(0, 50))
+    optimizer.startTraining()
+    for _ in range(11):
+        optimizer.next(10 + optimizer.getGeneValue("b"))
+    lastValues = {"a": optimizer.getGeneValue("a"), "b": optimizer.getGeneValue("b")}
+    optimizer.next(1.0)
+    assert optimizer.frozenGenes
+    for label in optimizer.frozenGenes:
+        assert optimizer.frozenGenes[label].value == lastValues[label]
+
+
+def testNoFreezingWithoutEvidence():
+    optimizer = annealing.Optimizer(seed=9, freezeAfterTrials=2)
+    optimizer.addGene("lr", annealing.GeneFloat(0, 1, 2))
+    optimizer.addGene("depth", annealing.GeneInt(1, 10))
+    optimizer.addGene("act", annealing.GeneChoice(["relu", "tanh"]))
+    optimizer.startTraining()
+    optimizer.next(1.0)
+    optimizer.next(2.0)
+    assert optimizer.freezeCheckDone
+    assert optimizer.frozenGenes == {}
+
+
+def testBloomSeenSetTriesEverySolutionBeforeTrainingOneAgain():
+    optimizer = annealing.Optimizer(minimumIterationsToRun=40, earlyStoppingIters=20, seenSet=BloomSeenSet(), seed=4)
+    optimizer.addGene("a", annealing.GeneInt(0, 10))
+    optimizer.addGene("b", annealing.GeneChoice(["x", "y", "z"]))
+    optimizer.startTraining()
+    triedSolutions = []
+    for _ in range(60):
+        triedSolutions.append((optimizer.getGeneValue("a"), optimizer.getGeneValue("b")))
+        done, _, _, _ = optimizer.next(1 + abs(optimizer.getGeneValue("a") - 4))
+        if done:
+            break
+    # The search space holds 33 solutions.  Only once they have all been tried is one handed back again.
+    assert len(set(triedSolutions[:33])) == 33
+
+
+@pytest.mark.parametrize("seed", [3, 6, 11, 151])
+def testNoSolutionIsHandedOutTwice(seed):
+    optimizer = annealing.Optimizer(minimumIterationsToRun=41, earlyStoppingIters=20, seed=seed, initialization="latinHypercube")
+    optimizer.addGene("x", annealing.GeneFloat(0, 1, 1))
+    optimizer.addGene("y", annealing.GeneFloat(0, 1, 1))
+    optimizer.startTraining()
+    triedSolutions = []
+    for _ in range(1000):
+        # Adding 0.0 turns -0.0 into 0.0, so equal values compare equal here.
+        values = (optimizer.getGeneValue("x") + 0.0, optimizer.getGeneValue("y") + 0.0)
+        triedSolutions.append(values)
+        done, _, _, _ = optimizer.next(1 + abs(values[0] - 0.3) + abs(values[1] - 0.6))
+        if done:
+            break
+    assert done
+    assert len(triedSolutions) == len(set(triedSolutions))
+
+
+def testEarlyStoppingFiresFromResolvedIterations():
+    optimizer = annealing.Optimizer(minimumIterationsToRun=20, earlyStoppingIters=10, seed=7)
+    optimizer.addGene("a", annealing.GeneInt(0, 4))
+    optimizer.startTraining()
+    numTrials = runUntilDone(optimizer, lambda o: 1 + abs(o.getGeneValue("a") - 2), 1000)
+    # Only 5 solutions exist, so nearly all of the 30 iterations have to be resolved from history.
+    assert numTrials <= 5
+    assert optimizer.earlyStoppingNeedToStop
+    assert optimizer.numIterationsResolvedFromHistory > 0
+    assert optimizer.numIterationsCompleted == numTrials + optimizer.numIterationsResolvedFromHistory
+
+
+def testInfeasibleSolutionsShareTheSeenSetKind():
+    seenSet = BloomSeenSet(initialCapacity=50, maxMemoryBytes=4096)
+    optimizer = annealing.Optimizer(minimumIterationsToRun=50, earlyStoppingIters=10, seenSet=seenSet, seed=8)
+    optimizer.addGene("b", annealing.GeneInt(0, 30))
+    optimizer.addConstraint(lambda params: params["b"] % 3 == 0)
+    optimizer.startTraining()
+    runUntilDone(optimizer, lambda o: 1 + abs(o.getGeneValue("b") - 13), 1000)
+    assert isinstance(optimizer.infeasibleSet, BloomSeenSet)
+    assert optimizer.infeasibleSet.maxMemoryBytes == 4096
+    assert len(optimizer.infeasibleSet) == optimizer.numConstraintRejections > 0
@@ -0,0 +1,138 @@
+import warnings
+
+import pytest
+
+from dino import genetic
+from dino.seenset import BloomSeenSet
+
+
+def runUntilDone(optimizer, maxTrials):
+    numTrials = 0
+    while numTrials < maxTrials:
+        numTrials += 1
+        done, _, _, _ = optimizer.next(optimizer.rng.random())
+        if done:
+            return numTrials
+    return numTrials
+
+
+def testBloomFalsePositivesDoNotStallTheLastGeneration():
+    seenSet = BloomSeenSet(initialCapacity=10, falsePositiveRate=0.2)
+    optimizer = genetic.Optimizer(populationSize=6, seenSet=seenSet, seed=1, maxSeenProposalsBeforeExhausted=200)
+    optimizer.addGene("a", genetic.GeneInt(0, 29))
+    optimizer.addGene("b", genetic.GeneBool())
+    optimizer.startTraining()
+    numTrials = runUntilDone(optimizer, 1000)
+    assert numTrials <= 60
+
+
+def testSaturatedBloomEndsTheRun():
+    seenSet = BloomSeenSet(initialCapacity=100, falsePositiveRate=0.01, maxMemoryBytes=300)
+    optimizer = genetic.Optimizer(populationSize=10, chanceOfMutation=50, seenSet=seenSet, seed=2, maxSeenProposalsBeforeExhausted=200)
+    for geneNum in range(10):
+        optimizer.addGene("gene_" + str(geneNum), genetic.GeneInt(0, 9))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        optimizer.startTraining()
+        numTrials = runUntilDone(optimizer, 100000)
+    assert numTrials < 100000
+    assert optimizer.getSeenSetStats()["saturated"] is True
+
+
+def testExactSeenSetExhaustsSmallSpace():
+    optimizer = genetic.Optimizer(populationSize=4, seed=3)
+    optimizer.addGene("a", genetic.GeneInt(0, 4))
+    optimizer.addGene("b", genetic.GeneBool())
+    optimizer.startTraining()
+    assert runUntilDone(optimizer, 1000) == 10
+
+
+def testFirstGenerationOnlyHoldsFeasibleSolutions():
+    checkedValues = []
+
+    def constraint(params):
+        checkedValues.append(params["a"])
+        return params["a"] % 4 == 0
+
+    optimizer = genetic.Optimizer(populationSize=4, seed=4)
+    optimizer.addGene("a", genetic.GeneInt(0, 39))
+    optimizer.addConstraint(constraint)
+    optimizer.startTraining()
+    assert all(individual.genes["a"].value % 4 == 0 for individual in optimizer.curGenerationIndividuals)
+    numRejected = len([value for value in checkedValues if value % 4 != 0])
+    assert numRejected > 0
+    assert optimizer.numPossibleSolutions == 40 - numRejected
+    assert optimizer.getConstraintRejectionRate() == numRejected / len(checkedValues)
+
+
+def testTooManyInfeasibleSolutionsRaises():
+    optimizer = genetic.Optimizer(populationSize=5, seed=5)
+    optimizer.addGene("a", genetic.GeneInt(0, 9))
+    optimizer.addConstraint(lambda params: params["a"] < 3)
+    with pytest.raises(Exception, match="FATAL"):
+        optimizer.startTraining()
+
+
+def testBreedingShrinksToTheFeasibleSolutionsLeft():
+    checkedValues = []
+
+    def constraint(params):
+        checkedValues.append((params["a"], params["b"]))
+        return params["a"] % 2 == 0
+
+    optimizer = genetic.Optimizer(populationSize=4, chanceOfMutation=50, seed=6)
+    optimizer.addGene("a", genetic.GeneInt(0, 9))
+    optimizer.addGene("b", genetic.GeneBool())
+    optimizer.addConstraint(constraint)
+    optimizer.startTraining()
+    triedSolutions = []
+    for _ in range(1000):
+        triedSolutions.append((optimizer.getGeneValue("a"), optimizer.getGeneValue("b")))
+        done, _, _, _ = optimizer.next(optimizer.rng.random())
+        if done:
+            break
+    # 10 of the 20 solutions are feasible.  Every one is tried exactly once, and the run ends on the last.
+    assert done
+    assert sorted(triedSolutions) == sorted((a, b) for a in range(0, 10, 2) for b in (False, True))
+    assert len(checkedValues) == len(set(checkedValues))
+    assert optimizer.getConstraintRejectionRate() == optimizer.numConstraintRejections / optimizer.numConstraintChecks
+    assert 0 < optimizer.getConstraintRejectionRate() <= 0.5
+
+
+def runWithTrace(optimizer, objective, maxTrials):
+    triedSolutions = []
+    for _ in range(maxTrials):
+        triedSolutions.append(tuple(optimizer.getGeneValue(label) for label in optimizer.requestedGenes))
+        done, _, _, _ = optimizer.next(objective(optimizer))
+        if done:
+            break
+    return triedSolutions
+
+
+def testFreezingRecountsTheRemainingSearchSpace():
+    optimizer = genetic.Optimizer(populationSize=5, chanceOfMutation=50, seed=7, freezeAfterTrials=30,
+                                  freezeImportanceThreshold=0.05)
+    optimizer.addGene("noise", genetic.GeneInt(0, 4))
+    optimizer.addGene("signal", genetic.GeneInt(0, 19))
+    optimizer.startTraining()
+    triedSolutions = runWithTrace(optimizer, lambda o: 1 + o.getGeneValue("signal"), 1000)
+    assert list(optimizer.frozenGenes) == ["noise"]
+    frozenValue = optimizer.frozenGenes["noise"].value
+    # Once frozen, every signal value is tried exactly once with the frozen noise value, and then the run ends.
+    assert len(triedSolutions) == len(set(triedSolutions))
+    assert sorted(signal for noise, signal in triedSolutions if noise == frozenValue) == list(range(20))
+    report = optimizer.getGeneImportance()
+    assert report["noise"] == {"importance": optimizer.importanceWhenFrozen["noise"], "frozen": True}
+    assert report["noise"]["importance"] < 0.05
+    assert report["signal"]["frozen"] is False
+
+
+def testNoFreezingOnEqualScores():
+    optimizer = genetic.Optimizer(populationSize=5, seed=8, freezeAfterTrials=30)
+    optimizer.addGene("lr", genetic.GeneFloat(0, 1, 2))
+    optimizer.addGene("depth", genetic.GeneInt(1, 50))
+    optimizer.addGene("act", genetic.GeneChoice(["relu", "tanh", "elu"]))
+    optimizer.startTraining()
+    runWithTrace(optimizer, lambda o: 1.0, 40)
+    assert optimizer.frozenGenes == {}
+    assert optimizer.numPossibleSolutions == 101 * 50 * 3 - 40
@@ -0,0 +1,49 @@
+import random
+from math import inf as Infinity
+
+from dino.annealing import GeneChoice, GeneInt
+from dino.importance import GeneImportance
+
+
+def recordTrials(geneImportance, numTrials, objective, seed=0):
+    rng = random.Random(seed)
+    signal = GeneInt(0, 99)
+    noise = GeneChoice(["a", "b", "c"])
+    for _ in range(numTrials):
+        signal.value = rng.randint(0, 99)
+        noise.value = rng.choice(noise.choices)
+        geneImportance.record({"signal": signal, "noise": noise}, objective(signal.value, rng))
+
+
+def testSignalIsImportantAndNoiseIsNot():
+    geneImportance = GeneImportance()
+    recordTrials(geneImportance, 300, lambda value, rng: value + rng.gauss(0, 5))
+    importance = geneImportance.getImportance()
+    assert importance["signal"] > 0.8
+    assert importance["noise"] < 0.05
+    assert geneImportance.hasEvidence("signal")
+    assert geneImportance.hasEvidence("noise")
+
+
+def testEqualScoresGiveNoEvidence():
+    geneImportance = GeneImportance()
+    recordTrials(geneImportance, 100, lambda value, rng: 0.1)
+    assert geneImportance.getImportance() == {"signal": 0.0, "noise": 0.0}
+    assert not geneImportance.hasEvidence("signal")
+    assert not geneImportance.hasEvidence("noise")
+
+
+def testTooFewScoresGiveNoEvidence():
+    geneImportance = GeneImportance(minScoresPerLevel=3)
+    recordTrials(geneImportance, 2, lambda value, rng: value)
+    assert not geneImportance.hasEvidence("signal")
+    assert not geneImportance.hasEvidence("noise")
+    assert not geneImportance.hasEvidence("unknown")
+
+
+def testFailedRunsAreCountedButNotEstimated():
+    geneImportance = GeneImportance()
+    recordTrials(geneImportance, 50, lambda value, rng: value if value % 2 else Infinity)
+    assert geneImportance.numTrials == 50
+    assert 0 < geneImportance.numScored < 50
+    assert 0.0 <= geneImportance.getImportance()["signal"] <= 1.0
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from dino import genetic
+from dino.initialization import createDesign, INITIALIZATION_METHODS
+
+
+@pytest.mark.parametrize("method", INITIALIZATION_METHODS)
+def testDesignsAreUniqueAndInRange(method):
+    rng = random.Random(0)
+    for _ in range(300):
+        numParamsPerGene = [rng.randint(1, 12) for _ in range(rng.randint(1, 5))]
+        numPossibleSolutions = 1
+        for numParams in numParamsPerGene:
+            numPossibleSolutions *= numParams
+        numPoints = rng.randint(1, min(numPossibleSolutions, 60))
+        design = createDesign(numParamsPerGene, numPoints, method, rng)
+        assert len(design) == numPoints
+        assert len(set(tuple(indexes) for indexes in design)) == numPoints
+        for indexes in design:
+            for index, numParams in zip(indexes, numParamsPerGene):
+                assert 0 <= index < numParams
+
+
+def testLatinHypercubeStratifiesSmallGenes():
+    design = createDesign([101, 3], 12, "latinHypercube", random.Random(1))
+    counts = [sum(1 for indexes in design if indexes[1] == value) for value in range(3)]
+    assert counts == [4, 4, 4]
+
+
+def testLatinHypercubeStratifiesSpacesOfSmallGenes():
+    rng = random.Random(2)
+    for _ in range(500):
+        numParamsPerGene = [rng.randint(2, 4) for _ in range(rng.randint(2, 5))]
+        numPossibleSolutions = 1
+        for numParams in numParamsPerGene:
+            numPossibleSolutions *= numParams
+        numPoints = rng.randint(2, max(2, numPossibleSolutions * 4 // 5))
+        design = createDesign(numParamsPerGene, numPoints, "latinHypercube", rng)
+        assert len(set(tuple(indexes) for indexes in design)) == numPoints
+        for geneNum, numParams in enumerate(numParamsPerGene):
+            counts = [sum(1 for indexes in design if indexes[geneNum] == value) for value in range(numParams)]
+            assert max(counts) - min(counts) <= 1
+
+
+def testLatinHypercubeUsesEveryValueOfEveryGene():
+    design = createDesign([3, 3, 3], 10, "latinHypercube", random.Random(5))
+    for geneNum in range(3):
+        counts = sorted(sum(1 for indexes in design if indexes[geneNum] == value) for value in range(3))
+        assert counts == [3, 3, 4]
+
+
+def testFullSearchSpaceDesignIsUnique():
+    design = createDesign([2, 3, 2], 12, "latinHypercube", random.Random(3))
+    assert sorted(tuple(indexes) for indexes in design) == [(a, b, c) for a in range(2) for b in range(3) for c in range(2)]
+
+
+def testDesignLargerThanSpaceRaises():
+    with pytest.raises(Exception, match="FATAL"):
+        createDesign([2, 2], 5, "latinHypercube")
+
+
+@pytest.mark.parametrize("method", ["latinHypercube", "halton"])
+def testFirstGenerationIsUniqueAcrossGeneTypes(method):
+    optimizer = genetic.Optimizer(populationSize=10, initialization=method, seed=2)
+    optimizer.addGene("bool", genetic.GeneBool())
+    optimizer.addGene("int", genetic.GeneInt(0, 3))
+    optimizer.addGene("float", genetic.GeneFloat(0, 1, 1))
+    optimizer.addGene("choice", genetic.GeneChoice(["a", "b", "c"]))
+    optimizer.startTraining()
+    hashes = [individual.getHash() for individual in optimizer.curGenerationIndividuals]
+    assert len(set(hashes)) == 10
@@ -0,0 +1,116 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from dino import annealing, genetic
+from dino.rng import createRng, deriveSeed
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def buildOptimizer(module, seed):
+    if module is genetic:
+        optimizer = genetic.Optimizer(populationSize=10, seed=seed)
+    else:
+        optimizer = annealing.Optimizer(minimumIterationsToRun=100, earlyStoppingIters=20, seed=seed)
+    optimizer.addGene("a", module.GeneBool())
+    optimizer.addGene("b", module.GeneInt(0, 100))
+    optimizer.addGene("c", module.GeneFloat(0, 2, 1))
+    optimizer.addGene("d", module.GeneChoice(["x", "y", "z"]))
+    optimizer.startTraining()
+    return optimizer
+
+
+def runOptimizer(optimizer, numTrials, trace):
+    for _ in range(numTrials):
+        values = tuple(optimizer.getGeneValue(label) for label in "abcd")
+        trace.append(values)
+        score = 1 + abs(values[1] - 13) + (values[3] != "y") + values[2]
+        done, _, _, _ = optimizer.next(score)
+        if done:
+            break
+    return trace
+
+
+def testDerivedSeedsAreStableAndIndependent():
+    assert deriveSeed(1, "worker", 0) == deriveSeed(1, "worker", 0)
+    assert deriveSeed(1, "worker", 0) != deriveSeed(1, "worker", 1)
+    assert deriveSeed(1, "worker", 0) != deriveSeed(2, "worker", 0)
+    assert createRng(1, "a").random() == createRng(1, "a").random()
+
+
+@pytest.mark.parametrize("module", [genetic, annealing])
+def testSameSeedReplaysTheSameRun(module):
+    firstTrace = runOptimizer(buildOptimizer(module, 7), 150, [])
+    secondTrace = runOptimizer(buildOptimizer(module, 7), 150, [])
+    otherTrace = runOptimizer(buildOptimizer(module, 8), 150, [])
+    assert firstTrace == secondTrace
+    assert firstTrace != otherTrace
+
+
+@pytest.mark.parametrize("module", [genetic, annealing])
+def testPickledResumeMatchesUninterruptedRun(module):
+    uninterruptedTrace = runOptimizer(buildOptimizer(module, 11), 150, [])
+    optimizer = buildOptimizer(module, 11)
+    resumedTrace = runOptimizer(optimizer, 40, [])
+    optimizer = pickle.loads(pickle.dumps(optimizer))
+    resumedTrace = runOptimizer(optimizer, 150 - len(resumedTrace), resumedTrace)
+    assert resumedTrace == uninterruptedTrace
+
+
+RESUME_SCRIPT = """
+import pickle, sys
+sys.path.insert(0, {testsDir!r})
+sys.path.insert(0, {packageRoot!r})
+from test_rng import buildOptimizer, runOptimizer
+from dino import genetic, annealing
+module = {{"genetic": genetic, "annealing": annealing}}[sys.argv[1]]
+if sys.argv[2] == "save":
+    optimizer = buildOptimizer(module, 11)
+    trace = runOptimizer(optimizer, 40, [])
+    pickle.dump((optimizer, trace), open(sys.argv[3], "wb"))
+else:
+    optimizer, trace = pickle.load(open(sys.argv[3], "rb"))
+    trace = runOptimizer(optimizer, 150 - len(trace), trace)
+    pickle.dump(trace, open(sys.argv[3], "wb"))
+"""
+
+
+@pytest.mark.parametrize("module", [genetic, annealing])
+def testResumeInAnotherProcessMatchesUninterruptedRun(module, tmp_path):
+    # Each process gets its own string hash salt, so this fails if solution hashes depend on Python's hash().
+    scriptPath = tmp_path / "resume.py"
+    scriptPath.write_text(RESUME_SCRIPT.format(testsDir=os.path.join(PACKAGE_ROOT, "tests"), packageRoot=PACKAGE_ROOT))
+    checkpointPath = str(tmp_path / "checkpoint.pkl")
+    moduleName = module.__name__.split(".")[-1]
+    for step, hashSeed in (("save", "1"), ("load", "2")):
+        environment = dict(os.environ, PYTHONHASHSEED=hashSeed)
+        subprocess.run([sys.executable, str(scriptPath), moduleName, step, checkpointPath], check=True,
+                       env=environment, stdout=subprocess.DEVNULL)
+    with open(checkpointPath, "rb") as checkpointFile:
+        resumedTrace = pickle.load(checkpointFile)
+    assert resumedTrace == runOptimizer(buildOptimizer(module, 11), 150, [])
+
+
+@pytest.mark.parametrize("module", [genetic, annealing])
+def testSpawnedStreamsAreIndependentOfTheOptimizer(module):
+    optimizer = buildOptimizer(module, 12)
+    spawnedRng = optimizer.spawnRng("optimizer")
+    assert spawnedRng.random() != createRng(12, "optimizer").random()
+    assert optimizer.spawnRng("worker", 0).random() == buildOptimizer(module, 12).spawnRng("worker", 0).random()
+    assert optimizer.spawnRng("worker", 0).random() != optimizer.spawnRng("worker", 1).random()
+
+
+def isEven(params):
+    return params["b"] % 2 == 0
+
+
+@pytest.mark.parametrize("module", [genetic, annealing])
+def testOptimizerWithModuleLevelConstraintPickles(module):
+    optimizer = buildOptimizer(module, 13)
+    optimizer.addConstraint(isEven)
+    resumedOptimizer = pickle.loads(pickle.dumps(optimizer))
+    assert resumedOptimizer.constraints[0]({"b": 4})
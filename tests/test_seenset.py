@@ -0,0 +1,52 @@
+import pytest
+
+from dino.seenset import ExactSeenSet, BloomSeenSet
+
+
+def testExactSeenSetKeepsScores():
+    seenSet = ExactSeenSet()
+    seenSet.add(1)
+    seenSet.add(2, 0.5)
+    assert 1 in seenSet and 2 in seenSet and 3 not in seenSet
+    assert seenSet.getScore(1) is None
+    assert seenSet.getScore(2) == 0.5
+    seenSet.add(2)
+    assert seenSet.getScore(2) == 0.5
+
+
+def testBloomFalsePositiveRateMeetsTarget():
+    targetRate = 0.01
+    seenSet = BloomSeenSet(initialCapacity=1000, falsePositiveRate=targetRate)
+    for solutionHash in range(20000):
+        seenSet.add(solutionHash)
+    for solutionHash in range(20000):
+        assert solutionHash in seenSet
+    numFalsePositives = sum(1 for solutionHash in range(20000, 120000) if solutionHash in seenSet)
+    measuredRate = numFalsePositives / 100000
+    assert measuredRate <= targetRate * 1.5
+    stats = seenSet.getStats()
+    assert stats["estimatedFalsePositiveRate"] <= targetRate * 1.5
+    assert stats["saturated"] is False
+
+
+def testBloomCountsEveryAdd():
+    seenSet = BloomSeenSet(initialCapacity=100, falsePositiveRate=0.2)
+    for solutionHash in range(5000):
+        seenSet.add(solutionHash)
+    assert len(seenSet) == 5000
+    assert seenSet.getStats()["numItems"] == 5000
+
+
+def testBloomWarnsWhenSaturated():
+    seenSet = BloomSeenSet(initialCapacity=100, falsePositiveRate=0.01, maxMemoryBytes=300)
+    with pytest.warns(UserWarning, match="saturated"):
+        for solutionHash in range(5000):
+            seenSet.add(solutionHash)
+    stats = seenSet.getStats()
+    assert stats["saturated"] is True
+    assert stats["memoryBytes"] <= 300
+
+
+def testBloomRejectsFirstFilterOverBudget():
+    with pytest.raises(Exception, match="maxMemoryBytes"):
+        BloomSeenSet(initialCapacity=100000, falsePositiveRate=0.001, maxMemoryBytes=100)